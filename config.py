@@ -1,57 +1,126 @@
 import os
+from dataclasses import dataclass, field
+from typing import List, Optional
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# API settings
-API_TITLE = "PDF Result Page Finder API"
-API_VERSION = "1.0.0"
-
-# AI Service Configuration
-DEFAULT_AI_SERVICE = os.getenv("DEFAULT_AI_SERVICE").lower()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# OCR Configuration
-DEFAULT_OCR_SERVICE = os.getenv("DEFAULT_OCR_SERVICE").lower() if os.getenv("DEFAULT_OCR_SERVICE") else None
-
-# Result Type Configuration
-RESULT_TYPE = os.getenv("RESULT_TYPE", "single_page").lower()
-MULTI_PAGE_RESULT_TYPE = os.getenv("MULTI_PAGE_RESULT_TYPE", "consolidated").lower()
-
-# AWS Configuration
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
-AWS_S3_BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME", "results-sharing")
-AWS_ENABLED = os.getenv("AWS_ENABLED", "true").lower() == "true"
-
-# Telegram Configuration
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-TELEGRAM_ENABLED = os.getenv("TELEGRAM_ENABLED", "false").lower() == "true"
-# Control whether to send files directly to Telegram or use AWS S3 URLs
-TELEGRAM_USE_S3_URL = os.getenv("TELEGRAM_USE_S3_URL", "true").lower() == "true"
-
-# Testing Mode Configuration
-TESTING_MODE = os.getenv("TESTING_MODE", "false").lower() == "true"
-
-# Logging settings
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-
-# CORS settings
-CORS_ORIGINS = [
-    "http://localhost:8000",
-    "http://127.0.0.1:8000",
-    "http://localhost:3000",  # For frontend development
-    "http://127.0.0.1:3000",  # For frontend development
-    "*"  # Allow all origins in development
-]
-CORS_CREDENTIALS = True
-CORS_METHODS = ["*"]
-CORS_HEADERS = ["*"]
-
-# File cleanup settings
-FILE_CLEANUP_AGE = 3600  # 1 hour in seconds 
\ No newline at end of file
+# Load environment variables from .env in development only; deployed
+# environments get them from the process environment
+if os.getenv("APP_ENV", "dev") == "dev":
+    load_dotenv()
+
+# Explicit origins allow credentialed requests; otherwise any origin, without credentials
+_cors_origins = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Application settings read from the environment once at import time"""
+    # API settings
+    API_TITLE: str
+    API_VERSION: str
+
+    # AI Service Configuration
+    DEFAULT_AI_SERVICE: str
+    OPENAI_API_KEY: Optional[str]
+    GEMINI_API_KEY: Optional[str]
+
+    # OCR Configuration
+    DEFAULT_OCR_SERVICE: Optional[str]
+
+    # Result Type Configuration
+    RESULT_TYPE: str
+    MULTI_PAGE_RESULT_TYPE: str
+
+    # AWS Configuration
+    AWS_ACCESS_KEY_ID: Optional[str]
+    AWS_SECRET_ACCESS_KEY: Optional[str]
+    AWS_REGION: str
+    AWS_S3_BUCKET_NAME: str
+    AWS_ENABLED: bool
+
+    # Telegram Configuration
+    TELEGRAM_BOT_TOKEN: Optional[str]
+    TELEGRAM_CHAT_ID: Optional[str]
+    TELEGRAM_ENABLED: bool
+    # Control whether to send files directly to Telegram or use AWS S3 URLs
+    TELEGRAM_USE_S3_URL: bool
+
+    # Testing Mode Configuration
+    TESTING_MODE: bool
+
+    # Logging settings
+    LOG_LEVEL: str
+    LOG_FORMAT: str
+
+    # CORS settings
+    CORS_ORIGINS: List[str] = field(default_factory=list)
+    CORS_CREDENTIALS: bool = False
+    CORS_METHODS: List[str] = field(default_factory=lambda: ["*"])
+    CORS_HEADERS: List[str] = field(default_factory=lambda: ["*"])
+
+    # File cleanup settings
+    FILE_CLEANUP_AGE: int = 3600  # 1 hour in seconds
+
+    # Upload settings
+    MAX_UPLOAD_SIZE_MB: int = 50
+
+    # Number of AI extraction results kept per provider for identical OCR text
+    AI_RESULT_CACHE_SIZE: int = 256
+
+    # Optional SQLite file persisting AI extraction results across restarts, and their lifetime
+    AI_RESULT_CACHE_PATH: Optional[str] = None
+    AI_RESULT_CACHE_TTL: int = 7 * 24 * 3600  # 7 days in seconds
+
+    # Explicit Gemini/Vertex context cache for the fixed prompt; the prompt (~1k tokens)
+    # is at or below some models' minimum cacheable size, so it is opt-in
+    GEMINI_CONTEXT_CACHE: bool = False
+
+    # Number of OCR results kept per provider for identical document bytes, and their lifetime
+    OCR_RESULT_CACHE_SIZE: int = 64
+    OCR_RESULT_CACHE_TTL: int = 24 * 3600  # 1 day in seconds
+
+    # Minimum number of financial terms for a page to count as relevant
+    MIN_FINANCIAL_TERMS: int = 7
+
+
+@dataclass(slots=True)
+class RunFlags:
+    """Per-request flags that may change while a single document is processed"""
+    use_s3_url: bool
+
+
+SETTINGS = Settings(
+    API_TITLE="PDF Result Page Finder API",
+    API_VERSION="1.0.0",
+    DEFAULT_AI_SERVICE=(os.getenv("DEFAULT_AI_SERVICE") or "").lower(),
+    OPENAI_API_KEY=os.getenv("OPENAI_API_KEY"),
+    GEMINI_API_KEY=os.getenv("GEMINI_API_KEY"),
+    DEFAULT_OCR_SERVICE=os.getenv("DEFAULT_OCR_SERVICE").lower() if os.getenv("DEFAULT_OCR_SERVICE") else None,
+    RESULT_TYPE=os.getenv("RESULT_TYPE", "single_page").lower(),
+    MULTI_PAGE_RESULT_TYPE=os.getenv("MULTI_PAGE_RESULT_TYPE", "consolidated").lower(),
+    AWS_ACCESS_KEY_ID=os.getenv("AWS_ACCESS_KEY_ID"),
+    AWS_SECRET_ACCESS_KEY=os.getenv("AWS_SECRET_ACCESS_KEY"),
+    AWS_REGION=os.getenv("AWS_REGION", "us-east-1"),
+    AWS_S3_BUCKET_NAME=os.getenv("AWS_S3_BUCKET_NAME", "results-sharing"),
+    AWS_ENABLED=os.getenv("AWS_ENABLED", "true").lower() == "true",
+    TELEGRAM_BOT_TOKEN=os.getenv("TELEGRAM_BOT_TOKEN"),
+    TELEGRAM_CHAT_ID=os.getenv("TELEGRAM_CHAT_ID"),
+    TELEGRAM_ENABLED=os.getenv("TELEGRAM_ENABLED", "false").lower() == "true",
+    TELEGRAM_USE_S3_URL=os.getenv("TELEGRAM_USE_S3_URL", "true").lower() == "true",
+    TESTING_MODE=os.getenv("TESTING_MODE", "false").lower() == "true",
+    LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+    LOG_FORMAT="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    CORS_ORIGINS=_cors_origins or ["*"],
+    CORS_CREDENTIALS=bool(_cors_origins),
+    CORS_METHODS=["*"],
+    CORS_HEADERS=["*"],
+    FILE_CLEANUP_AGE=3600,
+    MAX_UPLOAD_SIZE_MB=int(os.getenv("MAX_UPLOAD_SIZE_MB", "50")),
+    AI_RESULT_CACHE_SIZE=int(os.getenv("AI_RESULT_CACHE_SIZE", "256")),
+    AI_RESULT_CACHE_PATH=os.getenv("AI_RESULT_CACHE_PATH") or None,
+    AI_RESULT_CACHE_TTL=int(os.getenv("AI_RESULT_CACHE_TTL", str(7 * 24 * 3600))),
+    GEMINI_CONTEXT_CACHE=os.getenv("GEMINI_CONTEXT_CACHE", "false").lower() == "true",
+    OCR_RESULT_CACHE_SIZE=int(os.getenv("OCR_RESULT_CACHE_SIZE", "64")),
+    OCR_RESULT_CACHE_TTL=int(os.getenv("OCR_RESULT_CACHE_TTL", str(24 * 3600))),
+    MIN_FINANCIAL_TERMS=int(os.getenv("MIN_FINANCIAL_TERMS", "7")),
+)
@@ -3,5 +3,6 @@ Core package containing essential business logic and core functionality.
 """
 from .financial_analyzer import FinancialAnalyzer
 from .document_processor import DocumentProcessor
+from .responses import ExtractResponse, MsgspecJSONResponse
 
-__all__ = ['FinancialAnalyzer', 'DocumentProcessor'] 
\ No newline at end of file
+__all__ = ['FinancialAnalyzer', 'DocumentProcessor', 'ExtractResponse', 'MsgspecJSONResponse'] 
\ No newline at end of file
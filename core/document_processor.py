@@ -1,4 +1,6 @@
 from typing import Dict, Optional
+import asyncio
+import threading
 import pymupdf
 import logging
 from services.analysis.text_analyzer import TextAnalyzer
@@ -7,12 +9,16 @@ from services.images.result_image_creator import ResultImageCreator
 from services.storage.s3_service import S3Service
 from services.notifications.telegram_notification_service import TelegramNotificationService
 from services.notifications.extraction_status_formatter import ExtractionStatusFormatter
+from services.notifications.notification_queue import notification_queue
 from core.financial_analyzer import FinancialAnalyzer
+from core.responses import ExtractResponse
 from services.ocr_integration.ocr_factory import OCRFactory, OCRServiceType
 from services.analysis.result_type_config import ResultTypeConfig
-import config
+from config import SETTINGS, RunFlags
+from utils.lazy import LazyLoader
+from utils.timing import reset_timings, stage
 import time
-import json
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -20,27 +26,104 @@ class DocumentProcessor:
     def __init__(self):
         self.text_extractor = PyMuPDFTextExtractor()
         self.text_analyzer = TextAnalyzer()
-        self.result_image_creator = ResultImageCreator()
-        self.financial_analyzer = FinancialAnalyzer()
-        
-        # Initialize AWS S3 service if configured
-        if config.AWS_ENABLED and config.AWS_ACCESS_KEY_ID and config.AWS_SECRET_ACCESS_KEY:
-            self.s3_service = S3Service()
-        else:
-            self.s3_service = None
-            if config.AWS_ENABLED:
-                logger.warning("AWS integration is enabled but credentials are missing")
-                
-        # Initialize Telegram service if configured and not in testing mode
-        if config.TELEGRAM_ENABLED and config.TELEGRAM_BOT_TOKEN and config.TELEGRAM_CHAT_ID and not config.TESTING_MODE:
-            self.telegram_service = TelegramNotificationService(config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID)
+
+        # Heavier services are only built when a request actually needs them
+        self._result_image_creator = LazyLoader(ResultImageCreator)
+        self._financial_analyzer = LazyLoader(FinancialAnalyzer)
+        self._s3_service = LazyLoader(self._build_s3_service)
+        self._telegram_service = LazyLoader(self._build_telegram_service)
+
+    @staticmethod
+    def _build_s3_service() -> Optional[S3Service]:
+        """Initialize AWS S3 service if configured"""
+        if SETTINGS.AWS_ENABLED and SETTINGS.AWS_ACCESS_KEY_ID and SETTINGS.AWS_SECRET_ACCESS_KEY:
+            return S3Service()
+        if SETTINGS.AWS_ENABLED:
+            logger.warning("AWS integration is enabled but credentials are missing")
+        return None
+
+    @staticmethod
+    def _build_telegram_service() -> Optional[TelegramNotificationService]:
+        """Initialize Telegram service if configured and not in testing mode"""
+        if SETTINGS.TELEGRAM_ENABLED and SETTINGS.TELEGRAM_BOT_TOKEN and SETTINGS.TELEGRAM_CHAT_ID and not SETTINGS.TESTING_MODE:
             logger.info("Telegram service initialized for production mode")
+            return TelegramNotificationService(SETTINGS.TELEGRAM_BOT_TOKEN, SETTINGS.TELEGRAM_CHAT_ID)
+        if SETTINGS.TESTING_MODE:
+            logger.info("Testing mode enabled - Telegram notifications will be bypassed")
+        elif SETTINGS.TELEGRAM_ENABLED:
+            logger.warning("Telegram integration is enabled but bot token or chat ID is missing")
+        return None
+
+    @property
+    def result_image_creator(self) -> ResultImageCreator:
+        return self._result_image_creator.get()
+
+    @property
+    def financial_analyzer(self) -> FinancialAnalyzer:
+        return self._financial_analyzer.get()
+
+    @property
+    def s3_service(self) -> Optional[S3Service]:
+        return self._s3_service.get()
+
+    @property
+    def telegram_service(self) -> Optional[TelegramNotificationService]:
+        return self._telegram_service.get()
+
+    async def _send_result_notification(self, caption: str, result_image_bytes: bytes, filename: str, use_s3: bool) -> None:
+        """Send the extraction report to Telegram, as an S3 link or as the image itself"""
+        if use_s3:
+            # Send only the message with S3 URL
+            if await self.telegram_service.send_message(caption, parse_mode="HTML"):
+                logger.info("S3 URL sent to Telegram successfully")
+            else:
+                logger.error("Failed to send S3 URL to Telegram")
+        else:
+            # Send file directly to Telegram
+            if await self.telegram_service.send_document_bytes(result_image_bytes, filename, caption):
+                logger.info("Result image sent to Telegram successfully")
+            else:
+                logger.error("Failed to send result image to Telegram")
+
+    async def _send_error_notification(self, error_message: str) -> None:
+        """Send the no-result-pages warning to Telegram"""
+        if await self.telegram_service.send_message(error_message):
+            logger.info("No result pages notification sent to Telegram successfully")
         else:
-            self.telegram_service = None
-            if config.TESTING_MODE:
-                logger.info("Testing mode enabled - Telegram notifications will be bypassed")
-            elif config.TELEGRAM_ENABLED:
-                logger.warning("Telegram integration is enabled but bot token or chat ID is missing")
+            logger.error("Failed to send no result pages notification to Telegram")
+
+    async def _extract_and_analyze(self, pdf_document: pymupdf.Document, result_type_config: ResultTypeConfig) -> Dict:
+        """
+        Extract and analyze pages as a pipeline: term analysis of page N runs
+        while page N+1 is being extracted in a worker thread.
+
+        Args:
+            pdf_document: The open PyMuPDF document
+            result_type_config: Configuration for result page type detection
+
+        Returns:
+            Dictionary containing analysis results, as from TextAnalyzer.analyze_document
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+        stop = threading.Event()
+        producer = asyncio.create_task(self.text_extractor.produce_pages(pdf_document, queue, stop))
+
+        analyzed_pages = []
+        try:
+            while (page := await queue.get()) is not None:
+                analyzed_pages.append(self.text_analyzer.analyze_page(page['text'], page['page_number']))
+        except BaseException:
+            # The caller closes the document once this returns, so wait until
+            # the producer's worker thread has stopped reading it
+            stop.set()
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            raise
+
+        # Surface extraction errors before classifying a partial document
+        await producer
+        # These classifications are discarded when the document goes through OCR
+        return self.text_analyzer.classify_document(analyzed_pages, result_type_config, skip_unqualified=True)
 
     async def process_document(
         self,
@@ -49,14 +132,14 @@ class DocumentProcessor:
         ocr_service: Optional[OCRServiceType] = None,
         stock_data: Optional[str] = None,
         python_start: float = None
-    ) -> Dict:
+    ) -> ExtractResponse:
         """
         Process a document through the following steps:
         1. Extract text using PyMuPDF
         2. Analyze for financial terms
         3. Apply OCR if needed
-        4. Create result PDF if result pages found
-        5. Send result PDF to S3 if configured
+        4. Render the first result page to a PNG image if result pages found
+        5. Run financial analysis on the image and upload it to S3 if configured
         
         Args:
             content: The document content in bytes
@@ -66,80 +149,104 @@ class DocumentProcessor:
             python_start: Start time of Python processing from time.perf_counter()
             
         Returns:
-            Dictionary containing processing results
+            ExtractResponse containing processing results
         """
         try:
+            # Per-request flags; never mutate the shared settings
+            run_flags = RunFlags(use_s3_url=SETTINGS.TELEGRAM_USE_S3_URL)
+            # Stage durations recorded by this request, including the financial analysis
+            timings = reset_timings()
+            # Telegram send scheduled once the response is ready
+            pending_notification = None
+            financial_analysis_result = None
+
             # Parse stock data if provided
-            stock_data_dict = json.loads(stock_data) if stock_data else {}
+            stock_data_dict = orjson.loads(stock_data) if stock_data else {}
             # Extract node.js elapsed time if provided
             node_elapsed_ms = stock_data_dict.get('nodeElapsedMs', 0)
             
             # Create result type configuration from stock data
-            result_type_config = ResultTypeConfig.from_stock_data(stock_data)
-            logger.info(f"Using result type configuration: {result_type_config}")
+            result_type_config = ResultTypeConfig.from_stock_data_dict(stock_data_dict)
+            logger.info("Using result type configuration: %s", result_type_config)
             
             # Use context manager to ensure PDF document is properly closed and reused
             with pymupdf.open(stream=content, filetype="pdf") as pdf_document:
-                # Extract text from PDF using PyMuPDF
-                pages = await self.text_extractor.extract_text(pdf_document)
-                
-                # Analyze pages for financial terms and classification
-                analysis_result = self.text_analyzer.analyze_document(pages, result_type_config)
-                logger.info(f"Pages analyzed. Found {len(analysis_result['pages'])} pages.")
+                # Extract text with PyMuPDF and analyze pages for financial terms and classification
+                analysis_result = await self._extract_and_analyze(pdf_document, result_type_config)
+                logger.info("Pages analyzed. Found %d pages.", len(analysis_result['pages']))
                 
-                # Store whether OCR was needed and initialize duration
+                # Store whether OCR was needed
                 needs_ocr = analysis_result['needs_ocr']
-                ocr_duration = None
                 processing_time = None
                 
                 # If OCR is needed, process with selected OCR service
                 if needs_ocr:
-                    logger.info(f"OCR processing required, using {ocr_service.value}")
-                    ocr_start = time.perf_counter()
-                    ocr_service_instance = OCRFactory.get_ocr_service(ocr_service)
-                    ocr_pages = await ocr_service_instance.process_document(content, filename)
-                    ocr_duration = time.perf_counter() - ocr_start
-
-                    # Re-analyze the OCR processed pages
-                    analysis_result = self.text_analyzer.analyze_document(ocr_pages, result_type_config)
-                    logger.info(f"OCR pages analyzed. Found {len(analysis_result['pages'])} pages.")
+                    logger.info("OCR processing required, using %s", ocr_service.value)
+                    with stage("ocr_duration"):
+                        ocr_service_instance = OCRFactory.get_ocr_service(ocr_service)
+                        # Pass along the page count of the already open document instead of
+                        # having the OCR service parse the PDF again
+                        ocr_pages = await ocr_service_instance.process_document(
+                            content, filename, page_count=pdf_document.page_count
+                        )
+
+                    # Re-analyze the OCR processed pages off the event loop; the whole document
+                    # arrives at once here, unlike the pipelined first pass
+                    analysis_result = await asyncio.to_thread(self.text_analyzer.analyze_document, ocr_pages, result_type_config)
+                    # The analyzed pages hold their own (stripped) text; drop the raw OCR pages
+                    # instead of keeping both copies alive for the rest of the request
+                    del ocr_pages
+                    logger.info("OCR pages analyzed. Found %d pages.", len(analysis_result['pages']))
                 
-                # Create a new PDF with only result pages
-                result_page_number = [p["page_number"] for p in analysis_result['pages'] if p["classification"] == "Results Page"]
-                logger.info(f"Found {len(result_page_number)} result pages")
-                # Check if any pages were processed with OCR
-                ocr_applied = any(page.get('isOcr', False) for page in analysis_result['pages'])
+                # Collect the result page numbers
+                result_page_number = [p.page_number for p in analysis_result['pages'] if p.classification == "Results Page"]
+                logger.info("Found %d result pages", len(result_page_number))
+                # Pages come from the OCR service exactly when OCR was needed
+                ocr_applied = needs_ocr
                 
                 # Create result image if result pages found
                 result_image_bytes = None
                 s3_url = None
-                result_page_generation_duration = None
                 if result_page_number:
                     # Take only the first result page for image creation
-                    result_page_generation_start = time.perf_counter()
-                    result_image_bytes = self.result_image_creator.create_result_image(pdf_document, result_page_number[0])
-                    result_page_generation_duration = time.perf_counter() - result_page_generation_start
+                    with stage("result_page_generation_duration"):
+                        result_image_bytes = await asyncio.to_thread(self.result_image_creator.create_result_image, pdf_document, result_page_number[0])
+
+                    # Reuse the OCR text of the result page if the document already went through OCR
+                    pre_ocr = None
+                    if needs_ocr:
+                        result_page = next(p for p in analysis_result['pages'] if p.page_number == result_page_number[0])
+                        pre_ocr = {'text': result_page.text}
 
                     # Start financial analysis and get results
-                    financial_analysis_result = await self.financial_analyzer.start_analysis(
-                        result_pdf_bytes=result_image_bytes,
+                    financial_analysis = self.financial_analyzer.start_analysis(
+                        result_image_bytes=result_image_bytes,
                         filename=filename,
                         stock_data_dict=stock_data_dict,
-                        python_start=python_start
+                        python_start=python_start,
+                        pre_ocr=pre_ocr
                     )
 
                     # Handle S3 upload and prepare message for either Telegram or testing
                     s3_url = None
+                    if result_image_bytes and run_flags.use_s3_url and self.s3_service:
+                        # Upload to S3 while the financial analysis is running
+                        financial_analysis_result, s3_url = await asyncio.gather(
+                            financial_analysis,
+                            asyncio.to_thread(self.s3_service.upload_file, result_image_bytes, filename)
+                        )
+                    else:
+                        financial_analysis_result = await financial_analysis
+
                     if result_image_bytes:
-                        if config.TELEGRAM_USE_S3_URL and self.s3_service:
-                            # Try to upload to S3 first
-                            s3_url = self.s3_service.upload_file(result_image_bytes, filename)
+                        if run_flags.use_s3_url and self.s3_service:
                             if s3_url:
-                                logger.info(f"Result image uploaded to S3 successfully: {s3_url}")
+                                logger.info("Result image uploaded to S3 successfully: %s", s3_url)
                             else:
                                 logger.error("Failed to upload result image to S3")
                                 # Fallback to direct Telegram upload if S3 fails
-                                config.TELEGRAM_USE_S3_URL = False
+                                run_flags.use_s3_url = False
+                        use_s3 = run_flags.use_s3_url and s3_url is not None
                         
                         # Calculate total processing time in seconds
                         processing_time = round((node_elapsed_ms / 1000) + (time.perf_counter() - python_start), 2)
@@ -149,32 +256,22 @@ class DocumentProcessor:
                             filename, 
                             analysis_result['pages'], 
                             result_page_number,
-                            s3_url=s3_url if config.TELEGRAM_USE_S3_URL else None,
-                            processing_time=processing_time
+                            s3_url=s3_url if use_s3 else None,
+                            processing_time=processing_time,
+                            is_ocr=ocr_applied
                         )
                         
                         # Send to Telegram or log for testing mode
                         if self.telegram_service:
-                            if config.TELEGRAM_USE_S3_URL and s3_url:
-                                # Send only the message with S3 URL
-                                if self.telegram_service.send_message(caption, parse_mode="HTML"):
-                                    logger.info("S3 URL sent to Telegram successfully")
-                                else:
-                                    logger.error("Failed to send S3 URL to Telegram")
-                            else:
-                                # Send file directly to Telegram
-                                if self.telegram_service.send_document_bytes(result_image_bytes, filename, caption):
-                                    logger.info("Result image sent to Telegram successfully")
-                                else:
-                                    logger.error("Failed to send result image to Telegram")
-                        elif config.TESTING_MODE:
+                            pending_notification = (self._send_result_notification, caption, result_image_bytes, filename, use_s3)
+                        elif SETTINGS.TESTING_MODE:
                             # Log what would be sent to Telegram in testing mode
                             logger.info("TESTING MODE: Would have sent Telegram message:")
-                            logger.info(f"TESTING MODE: Caption: {caption}")
-                            if config.TELEGRAM_USE_S3_URL and s3_url:
-                                logger.info(f"TESTING MODE: Would have sent S3 URL message")
+                            logger.info("TESTING MODE: Caption: %s", caption)
+                            if use_s3:
+                                logger.info("TESTING MODE: Would have sent S3 URL message")
                             else:
-                                logger.info(f"TESTING MODE: Would have sent image document: {filename}")
+                                logger.info("TESTING MODE: Would have sent image document: %s", filename)
                 else:
                     # No result pages found even after OCR (if applied)
                     error_message = f"⚠️ ERROR: Not able to find the result page for {filename}. Please check configuration."
@@ -184,38 +281,39 @@ class DocumentProcessor:
                         error_message += f"\n\n🔍 OCR was applied using {ocr_service.value} but no result pages were found."
                     
                     if self.telegram_service:
-                        if self.telegram_service.send_message(error_message):
-                            logger.info("No result pages notification sent to Telegram successfully")
-                        else:
-                            logger.error("Failed to send no result pages notification to Telegram")
-                    elif config.TESTING_MODE:
+                        pending_notification = (self._send_error_notification, error_message)
+                    elif SETTINGS.TESTING_MODE:
                         # Log what would be sent to Telegram in testing mode
                         logger.info("TESTING MODE: Would have sent error message:")
-                        logger.info(f"TESTING MODE: Error message: {error_message}")
+                        logger.info("TESTING MODE: Error message: %s", error_message)
             
             # Prepare the response data
-            response_data = {
-                "status": "success",
-                "message": analysis_result['message'],
-                "pages": analysis_result['pages'],
-                "ocr_service": ocr_service.value if ocr_applied else None,
-                "s3_url": s3_url,
-                "sent_to_telegram": self.telegram_service is not None and result_image_bytes is not None,
-                "processing_time": processing_time if result_page_number else None,
-                "needs_ocr": needs_ocr,
-                "ocr_duration": ocr_duration,
-                "result_page_generation_duration": result_page_generation_duration
-            }
+            response_data = ExtractResponse(
+                status="success",
+                message=analysis_result['message'],
+                pages=analysis_result['pages'],
+                ocr_service=ocr_service.value if ocr_applied else None,
+                s3_url=s3_url,
+                sent_to_telegram=self.telegram_service is not None and result_image_bytes is not None,
+                processing_time=processing_time if result_page_number else None,
+                needs_ocr=needs_ocr,
+                ocr_duration=timings.get("ocr_duration"),
+                result_page_generation_duration=timings.get("result_page_generation_duration")
+            )
             
             # Include financial analysis results if available
-            if result_page_number and 'financial_analysis_result' in locals():
-                if financial_analysis_result and financial_analysis_result.get('status') == 'success':
-                    response_data["financial_analysis"] = financial_analysis_result.get('analysis_results')
-                elif financial_analysis_result:
-                    response_data["financial_analysis_error"] = financial_analysis_result.get('message', 'Financial analysis failed')
+            if result_page_number and financial_analysis_result is not None:
+                if financial_analysis_result.get('status') == 'success':
+                    response_data.financial_analysis = financial_analysis_result.get('analysis_results')
+                else:
+                    response_data.financial_analysis_error = financial_analysis_result.get('message', 'Financial analysis failed')
+
+            # Telegram delivery happens after the response is returned
+            if pending_notification:
+                notification_queue.put(*pending_notification)
             
             return response_data
             
         except Exception as e:
-            logger.error(f"Error processing document: {str(e)}")
+            logger.error("Error processing document: %s", e)
             raise 
\ No newline at end of file
@@ -1,23 +1,27 @@
 from services.notifications.financial_report_builder import FinancialReportBuilder
 from services.notifications.estimates_calculator import EstimatesCalculator
 from services.notifications.estimates_report_builder import EstimatesReportBuilder
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 from services.ocr_integration.ocr_factory import OCRFactory, OCRServiceType
 import asyncio
 from services.notifications.telegram_notification_service import TelegramNotificationService
+from services.notifications.notification_queue import notification_queue
 from services.ai_integration.assistant_factory import AssistantFactory
-import config
+from config import SETTINGS
+from utils.lazy import LazyLoader
+from utils.timing import get_timings, stage
 from dataclasses import dataclass
 logger = logging.getLogger(__name__)
 
 @dataclass
 class AnalysisParams:
     """Parameters for financial analysis"""
-    pdf_bytes: bytes  # Contains single page PDF
+    image_bytes: bytes  # PNG render of the result page
     filename: str
     stock_data_dict: Dict[str, Any] = None  
     python_start: float = None
+    pre_ocr: Optional[Dict[str, Any]] = None  # OCR output already produced for this page
 
 class FinancialAnalyzer:
     def __init__(self):
@@ -25,47 +29,64 @@ class FinancialAnalyzer:
         self.estimates_calculator = EstimatesCalculator()
         self.estimates_report_builder = EstimatesReportBuilder()
         
-        # Initialize AI assistant
-        try:
-            self.ai_assistant = AssistantFactory.get_assistant(config.DEFAULT_AI_SERVICE)
-            logger.info(f"Initialized {config.DEFAULT_AI_SERVICE} AI assistant")
-        except Exception as e:
-            logger.error(f"Failed to initialize AI assistant: {str(e)}")
-            self.ai_assistant = None
+        # AI assistant is only built when _analyze_with_ai first runs
+        self._ai_assistant = LazyLoader(self._build_ai_assistant)
+
+        # Result page OCR goes straight to the shared Textract service
+        self._textract = OCRFactory.get_ocr_service(OCRServiceType.TEXTRACT_SERVICE)
             
         # Initialize Telegram service if configured and not in testing mode
-        if config.TELEGRAM_ENABLED and config.TELEGRAM_BOT_TOKEN and config.TELEGRAM_CHAT_ID and not config.TESTING_MODE:
-            self.telegram_service = TelegramNotificationService(config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID)
+        if SETTINGS.TELEGRAM_ENABLED and SETTINGS.TELEGRAM_BOT_TOKEN and SETTINGS.TELEGRAM_CHAT_ID and not SETTINGS.TESTING_MODE:
+            self.telegram_service = TelegramNotificationService(SETTINGS.TELEGRAM_BOT_TOKEN, SETTINGS.TELEGRAM_CHAT_ID)
             logger.info("FinancialAnalyzer Telegram service initialized for production mode")
         else:
             self.telegram_service = None
-            if config.TESTING_MODE:
+            if SETTINGS.TESTING_MODE:
                 logger.info("FinancialAnalyzer: Testing mode enabled - financial analysis Telegram notifications will be bypassed")
 
+    @staticmethod
+    def _build_ai_assistant():
+        """Initialize the configured AI assistant, or None if it cannot be created"""
+        try:
+            ai_assistant = AssistantFactory.get_assistant(SETTINGS.DEFAULT_AI_SERVICE)
+            logger.info("Initialized %s AI assistant", SETTINGS.DEFAULT_AI_SERVICE)
+            return ai_assistant
+        except Exception as e:
+            logger.error("Failed to initialize AI assistant: %s", e)
+            return None
+
+    @property
+    def ai_assistant(self):
+        return self._ai_assistant.get()
+
     async def start_analysis(
         self,
-        result_pdf_bytes: bytes,
+        result_image_bytes: bytes,
         filename: str = "result.pdf",
         stock_data_dict: Dict[str, Any] = None,
-        python_start: float = None
+        python_start: float = None,
+        pre_ocr: Optional[Dict[str, Any]] = None
     ) -> Dict:
         """
         Start the analysis process and return the results.
         
         Args:
-            result_pdf_bytes: The PDF content in bytes
+            result_image_bytes: PNG image of the result page, sent to Textract as is
             filename: The name of the file
             stock_data_dict: Optional stock data dictionary for additional analysis context
             python_start: Start time of Python processing from time.perf_counter()
+            pre_ocr: Optional OCR output for the result page from the document OCR pass;
+                     when given, the result page is not sent to Textract again
             
         Returns:
             Dictionary containing analysis results or None if analysis fails
         """
         params = AnalysisParams(
-            pdf_bytes=result_pdf_bytes,
+            image_bytes=result_image_bytes,
             filename=filename,
             stock_data_dict=stock_data_dict,
-            python_start=python_start
+            python_start=python_start,
+            pre_ocr=pre_ocr
         )
         # Process and return results instead of background processing
         return await self._process_and_notify(params)
@@ -79,19 +100,19 @@ class FinancialAnalyzer:
             analysis_result = await self.process_result_page(params)
 
             if analysis_result["status"] == "error":
-                logger.error(f"Analysis failed: {analysis_result['message']}")
+                logger.error("Analysis failed: %s", analysis_result['message'])
                 return analysis_result
 
             return analysis_result
 
         except Exception as e:
-            logger.error(f"Error in financial analysis processing: {str(e)}")
+            logger.error("Error in financial analysis processing: %s", e)
             error_message = f"⚠️ Error analyzing {params.filename}: {str(e)}"
             if self.telegram_service:
-                await self.telegram_service.send_message(error_message)
-            elif config.TESTING_MODE:
+                notification_queue.put(self.telegram_service.send_message, error_message)
+            elif SETTINGS.TESTING_MODE:
                 logger.info("TESTING MODE: Would have sent financial analysis error message:")
-                logger.info(f"TESTING MODE: Error message: {error_message}")
+                logger.info("TESTING MODE: Error message: %s", error_message)
             
             return {
                 "status": "error",
@@ -100,11 +121,11 @@ class FinancialAnalyzer:
 
     async def process_result_page(self, params: AnalysisParams) -> Dict:
         """
-        Process result page by sending PDF bytes directly to AI model.
+        Process the result page image through OCR and the AI model.
         """
         try:
-            logger.info(f"Processing PDF directly with AI model for file {params.filename}")
-            analysis_results = await self._analyze_with_ai(params.pdf_bytes, params.stock_data_dict, params.python_start)
+            logger.info("Processing result page image with AI model for file %s", params.filename)
+            analysis_results = await self._analyze_with_ai(params.image_bytes, params.stock_data_dict, params.python_start, params.pre_ocr)
             
             return {
                 "status": "success",
@@ -112,41 +133,49 @@ class FinancialAnalyzer:
             }
                 
         except Exception as e:
-            logger.error(f"Error processing result page for {params.filename}: {str(e)}")
+            logger.error("Error processing result page for %s: %s", params.filename, e)
             return {
                 "status": "error",
                 "message": f"Failed to process result page: {str(e)}"
             }
 
-    async def _analyze_with_ai(self, pdf_bytes: bytes, stock_data_dict: Dict[str, Any] = None, python_start: float = None) -> Dict:
+    async def _analyze_with_ai(
+        self,
+        image_bytes: bytes,
+        stock_data_dict: Dict[str, Any] = None,
+        python_start: float = None,
+        pre_ocr: Optional[Dict[str, Any]] = None
+    ) -> Dict:
         """
-        Analyze PDF bytes directly with AI model and format results for Telegram.
+        OCR the result page image, analyze it with the AI model and format results for Telegram.
         
         Args:
-            pdf_bytes: The PDF content in bytes
+            image_bytes: PNG image of the result page
             stock_data_dict: Optional stock data dictionary for additional analysis context
             python_start: Start time of Python processing from time.perf_counter()
+            pre_ocr: Optional OCR output already available for this page
         """
         try:
             if not self.ai_assistant:
                 raise ValueError("AI assistant not initialized")
     
+            timings = get_timings()
+
             # Track result page OCR timing
-            import time
-            result_page_ocr_start = time.perf_counter()
-            ocr_service = OCRFactory.get_ocr_service(OCRServiceType.TEXTRACT_SERVICE)
-            ocr_data = await ocr_service.process_document(pdf_bytes)
-            result_page_ocr_end = time.perf_counter()
-            result_page_ocr_duration = result_page_ocr_end - result_page_ocr_start;
+            with stage("result_page_ocr_duration"):
+                if pre_ocr is not None:
+                    # Reuse the document OCR pass instead of a second billable call
+                    logger.info("Reusing document OCR output for result page")
+                    ocr_data = pre_ocr
+                else:
+                    ocr_data = await self._textract.process_document(image_bytes)
             
-            logger.info(f"Result page OCR duration: {result_page_ocr_duration} seconds")
-            logger.info(f"OCR data: {ocr_data}")
+            logger.info("Result page OCR duration: %s seconds", timings['result_page_ocr_duration'])
+            logger.info("OCR data: %s", ocr_data)
           
             # Track AI analysis timing
-            ai_start_time = time.perf_counter()
-            analysis_result = await self.ai_assistant.extract_financial_data(ocr_data)
-            ai_end_time = time.perf_counter()
-            ai_duration = ai_end_time - ai_start_time
+            with stage("ai_analysis_duration"):
+                analysis_result = await self.ai_assistant.extract_financial_data(ocr_data)
             
             # Add processing time and timing data to the result
             if stock_data_dict:
@@ -155,9 +184,9 @@ class FinancialAnalyzer:
             
             # Add detailed timing information
             analysis_result["data"]["timing"] = {
-                "result_page_ocr_duration": result_page_ocr_duration,
-                "ai_analysis_duration": ai_duration,
-                "total_financial_analysis_duration": ai_duration + result_page_ocr_duration
+                "result_page_ocr_duration": timings["result_page_ocr_duration"],
+                "ai_analysis_duration": timings["ai_analysis_duration"],
+                "total_financial_analysis_duration": timings["ai_analysis_duration"] + timings["result_page_ocr_duration"]
             }
 
             # Calculate estimates if stock data is available
@@ -181,7 +210,7 @@ class FinancialAnalyzer:
                     
                     logger.info("Successfully calculated and formatted estimates")
                 except Exception as e:
-                    logger.error(f"Error calculating estimates: {str(e)}")
+                    logger.error("Error calculating estimates: %s", e)
                     # Continue with the analysis even if estimates calculation fails
   
             # Format the data for both Telegram/logging and frontend response
@@ -193,24 +222,24 @@ class FinancialAnalyzer:
             # If Telegram service is available, send the formatted data
             if self.telegram_service:
                 # Send financial data
-                self.telegram_service.send_message(formatted_financial, parse_mode="HTML")
+                notification_queue.put(self.telegram_service.send_message, formatted_financial, parse_mode="HTML")
                 
                 # Send estimates if available
                 if "formatted_estimates" in analysis_result["data"]:
-                    self.telegram_service.send_message(analysis_result["data"]["formatted_estimates"], parse_mode="HTML")
-            elif config.TESTING_MODE:
+                    notification_queue.put(self.telegram_service.send_message, analysis_result["data"]["formatted_estimates"], parse_mode="HTML")
+            elif SETTINGS.TESTING_MODE:
                 logger.info("TESTING MODE: Would have sent financial analysis message:")
-                logger.info(f"TESTING MODE: Financial data message: {formatted_financial}")
+                logger.info("TESTING MODE: Financial data message: %s", formatted_financial)
                 
                 # Log estimates if available
                 if "formatted_estimates" in analysis_result["data"]:
                     logger.info("TESTING MODE: Would have sent estimates message:")
-                    logger.info(f"TESTING MODE: Estimates message: {analysis_result['data']['formatted_estimates']}")
+                    logger.info("TESTING MODE: Estimates message: %s", analysis_result['data']['formatted_estimates'])
             
             return analysis_result["data"]
             
         except Exception as e:
-            logger.error(f"Error in AI analysis: {str(e)}")
+            logger.error("Error in AI analysis: %s", e)
             return {
                 "status": "error",
                 "message": f"AI analysis failed: {str(e)}"
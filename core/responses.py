@@ -0,0 +1,29 @@
+from typing import Any, Dict, List, Optional, Union
+import msgspec
+from starlette.responses import JSONResponse
+from services.analysis import AnalyzedPage
+
+class ExtractResponse(msgspec.Struct):
+    """Response body of /api/extract-text"""
+    status: str
+    message: str
+    pages: List[AnalyzedPage]
+    ocr_service: Optional[str]
+    s3_url: Optional[str]
+    sent_to_telegram: bool
+    processing_time: Optional[float]
+    needs_ocr: bool
+    ocr_duration: Optional[float]
+    result_page_generation_duration: Optional[float]
+    # Only one of these is present, and only when a result page was analyzed
+    financial_analysis: Union[Dict[str, Any], msgspec.UnsetType] = msgspec.UNSET
+    financial_analysis_error: Union[str, msgspec.UnsetType] = msgspec.UNSET
+
+# Shared encoder, built once instead of per response
+_encoder = msgspec.json.Encoder()
+
+class MsgspecJSONResponse(JSONResponse):
+    """JSON response rendered with msgspec, for Structs as well as plain dicts"""
+
+    def render(self, content: Any) -> bytes:
+        return _encoder.encode(content)
@@ -4,34 +4,47 @@ from contextlib import asynccontextmanager
 import logging
 import time
 from core.document_processor import DocumentProcessor
-from services.ocr_integration.ocr_factory import OCRServiceType
-import config
+from core.responses import MsgspecJSONResponse
+from services.ocr_integration.ocr_factory import OCRFactory, OCRServiceType
+from services.notifications.notification_queue import notification_queue
+from services.notifications.telegram_notification_service import close_telegram_client
+from services.ai_integration._http import close_shared_httpx_client
+from services.ai_integration.assistant_factory import AssistantFactory
+from config import SETTINGS
 
 # Configure logging
-logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+logging.basicConfig(level=SETTINGS.LOG_LEVEL, format=SETTINGS.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Application starting up...")
+    notification_queue.start()
+    if SETTINGS.DEFAULT_AI_SERVICE:
+        await AssistantFactory.warmup([SETTINGS.DEFAULT_AI_SERVICE])
     yield
     # Shutdown
     logger.info("Application shutting down...")
+    await notification_queue.stop()
+    await close_telegram_client()
+    await OCRFactory.close_services()
+    await close_shared_httpx_client()
 
 app = FastAPI(
-    title=config.API_TITLE,
-    version=config.API_VERSION,
-    lifespan=lifespan
+    title=SETTINGS.API_TITLE,
+    version=SETTINGS.API_VERSION,
+    lifespan=lifespan,
+    default_response_class=MsgspecJSONResponse
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=config.CORS_ORIGINS,
-    allow_credentials=config.CORS_CREDENTIALS,
-    allow_methods=config.CORS_METHODS,
-    allow_headers=config.CORS_HEADERS,
+    allow_origins=SETTINGS.CORS_ORIGINS,
+    allow_credentials=SETTINGS.CORS_CREDENTIALS,
+    allow_methods=SETTINGS.CORS_METHODS,
+    allow_headers=SETTINGS.CORS_HEADERS,
 )
 
 # Initialize components
@@ -40,9 +53,9 @@ document_processor = DocumentProcessor()
 def get_default_ocr_service() -> OCRServiceType:
     """Get the default OCR service type from config"""
     try:
-        return OCRServiceType(config.DEFAULT_OCR_SERVICE)
+        return OCRServiceType(SETTINGS.DEFAULT_OCR_SERVICE)
     except ValueError:
-        logger.warning(f"Invalid OCR service type in config: {config.DEFAULT_OCR_SERVICE}. Using AWS Textract as default.")
+        logger.warning(f"Invalid OCR service type in config: {SETTINGS.DEFAULT_OCR_SERVICE}. Using AWS Textract as default.")
         return OCRServiceType.TEXTRACT_SERVICE
 
 @app.post("/api/extract-text")
@@ -51,7 +64,7 @@ async def extract_text(
     announcement: str = Form(None),
     stockData: str = Form(None),
     ocr_service: OCRServiceType = None
-) -> dict:
+) -> MsgspecJSONResponse:
     python_start = time.perf_counter()
     
     try:
@@ -61,6 +74,15 @@ async def extract_text(
             
         logger.info(f"Processing file: {file.filename} with OCR service: {ocr_service.value}")
         
+        # Reject oversized uploads before reading them into memory;
+        # the multipart parser has already spooled the body to disk
+        max_upload_bytes = SETTINGS.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        if file.size is not None and file.size > max_upload_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the {SETTINGS.MAX_UPLOAD_SIZE_MB} MB upload limit"
+            )
+        
         # Read the uploaded file
         content = await file.read()
         if not content:
@@ -98,8 +120,11 @@ async def extract_text(
             python_start=python_start
         )
         
-        return result
+        # Returned as a Response so FastAPI hands the Struct straight to msgspec
+        return MsgspecJSONResponse(result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}")
         raise HTTPException(
@@ -109,7 +134,7 @@ async def extract_text(
     
 @app.get("/")
 async def read_root():
-    return {"message": config.API_TITLE}
+    return {"message": SETTINGS.API_TITLE}
 
 @app.get("/test")
 async def test_endpoint():
@@ -1,7 +1,8 @@
 """
 Services package containing various service modules for the application.
 """
-from .ai_integration import BaseAssistant, OpenAIAssistant, GeminiAssistant, AssistantFactory
+from typing import Any
+from .ai_integration import BaseAssistant, AssistantFactory
 from .analysis import PageClassifier, TextAnalyzer, ResultTypeConfig
 from .storage import S3Service
 from .ocr_integration import BaseOCR, OCRFactory
@@ -24,4 +25,11 @@ __all__ = [
     'ResultImageCreator',
     # Notifications
     'ExtractionStatusFormatter', 'TelegramNotificationService', 'FinancialReportBuilder'
-] 
\ No newline at end of file
+]
+
+def __getattr__(name: str) -> Any:
+    # AI provider classes load their SDKs on first access
+    if name in ('OpenAIAssistant', 'GeminiAssistant'):
+        from . import ai_integration
+        return getattr(ai_integration, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,15 @@
 """
 AI Integration service package for handling AI-related functionality.
 """
+from typing import Any
 from .base_assistant import BaseAssistant
-from .providers.openai_assistant import OpenAIAssistant
-from .providers.gemini_assistant import GeminiAssistant
 from .assistant_factory import AssistantFactory
 
-__all__ = ['BaseAssistant', 'OpenAIAssistant', 'GeminiAssistant', 'AssistantFactory'] 
\ No newline at end of file
+__all__ = ['BaseAssistant', 'OpenAIAssistant', 'GeminiAssistant', 'AssistantFactory']
+
+def __getattr__(name: str) -> Any:
+    # Provider classes are resolved lazily so their SDKs load only when used
+    if name in ('OpenAIAssistant', 'GeminiAssistant'):
+        from . import providers
+        return getattr(providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
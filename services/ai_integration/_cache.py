@@ -0,0 +1,130 @@
+import asyncio
+import copy
+import functools
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import orjson
+from config import SETTINGS
+from .prompts import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+def _text_of(ocr_text: Any) -> str:
+    """Textract results also carry per-call timing, so only their text identifies the input"""
+    if isinstance(ocr_text, dict):
+        ocr_text = ocr_text.get("text", "")
+    return str(ocr_text)
+
+def _cache_key(ocr_text: Any) -> str:
+    """Hash the OCR text"""
+    return hashlib.blake2b(_text_of(ocr_text).encode(), digest_size=16).hexdigest()
+
+def _store_key(assistant: Any, ocr_text: Any) -> str:
+    """Hash the prompt version, provider, model and OCR text, so a change to any of them misses"""
+    parts = (PROMPT_VERSION, type(assistant).__name__, str(getattr(assistant, "default_model", "")), _text_of(ocr_text))
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+class ResultStore:
+    """SQLite table of extraction results keyed by content hash, each kept for a fixed TTL"""
+
+    def __init__(self, path: str, ttl: int):
+        """
+        Args:
+            path: SQLite database file
+            ttl: Seconds a stored result stays valid
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extraction_results "
+            "(key TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the stored data for a key, or None if it is missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM extraction_results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, key: str, data: Dict) -> None:
+        """Store data for a key, replacing any previous entry"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extraction_results (key, data, expires_at) VALUES (?, ?, ?)",
+                (key, orjson.dumps(data), time.time() + self.ttl)
+            )
+
+@functools.lru_cache(maxsize=1)
+def get_result_store() -> Optional[ResultStore]:
+    """The process-wide persistent store, or None when AI_RESULT_CACHE_PATH is not set"""
+    if not SETTINGS.AI_RESULT_CACHE_PATH:
+        return None
+    return ResultStore(SETTINGS.AI_RESULT_CACHE_PATH, SETTINGS.AI_RESULT_CACHE_TTL)
+
+def _cached_result(data: Dict) -> Dict:
+    """Wrap cached data as an extraction result; callers add fields to it, so hand out a copy"""
+    return {"data": copy.deepcopy(data), "timing": {"duration": 0, "cached": True}}
+
+def cached_extraction(maxsize: int = 256) -> Callable:
+    """
+    Decorate an assistant's extract_financial_data with an exact-match LRU cache
+    keyed on a blake2b hash of the OCR text, backed by the persistent ResultStore
+    when one is configured.
+
+    Args:
+        maxsize: Maximum number of results kept in memory; 0 disables the in-memory layer
+
+    Returns:
+        Decorator for an async (self, ocr_text) -> Dict method
+    """
+    def decorator(func: Callable[..., Awaitable[Dict]]) -> Callable[..., Awaitable[Dict]]:
+        cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+        def remember(key: str, data: Dict) -> None:
+            if maxsize <= 0:
+                return
+            cache[key] = copy.deepcopy(data)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+
+        @functools.wraps(func)
+        async def wrapper(self, ocr_text: Any) -> Dict:
+            store = get_result_store()
+            if maxsize <= 0 and store is None:
+                return await func(self, ocr_text)
+
+            key = _cache_key(ocr_text)
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                logger.info("Financial data extraction served from cache")
+                return _cached_result(cached)
+
+            if store is not None:
+                store_key = _store_key(self, ocr_text)
+                stored = await asyncio.to_thread(store.get, store_key)
+                if stored is not None:
+                    logger.info("Financial data extraction served from the persistent cache")
+                    remember(key, stored)
+                    return _cached_result(stored)
+
+            result = await func(self, ocr_text)
+            remember(key, result["data"])
+            if store is not None:
+                try:
+                    await asyncio.to_thread(store.put, store_key, result["data"])
+                except sqlite3.Error as e:
+                    logger.warning("Could not persist extraction result: %s", e)
+            return result
+
+        return wrapper
+    return decorator
@@ -0,0 +1,25 @@
+import logging
+from typing import Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Process-wide client so LLM calls reuse pooled keep-alive connections
+_shared_client: Optional[httpx.AsyncClient] = None
+
+def get_shared_httpx_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client for AI provider SDKs, creating it on first use"""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=2000, max_keepalive_connections=1500),
+            timeout=httpx.Timeout(120.0)
+        )
+    return _shared_client
+
+async def close_shared_httpx_client() -> None:
+    """Close the shared client's pooled connections, e.g. on application shutdown"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
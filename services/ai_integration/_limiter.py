@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class AsyncTokenBucket:
+    """
+    Client-side rate limiter for a provider quota: requests per second and tokens per
+    minute, each refilled continuously. Callers wait in turn until both allow the call.
+    """
+
+    def __init__(self, rps: float = 0, tpm: int = 0):
+        """
+        Args:
+            rps: Requests per second; 0 disables the request limit
+            tpm: Prompt tokens per minute; 0 disables the token limit
+        """
+        self.rps = rps
+        self.tpm = tpm
+        self._requests = float(max(rps, 1))
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rps > 0 or self.tpm > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rps > 0:
+            self._requests = min(max(self.rps, 1), self._requests + elapsed * self.rps)
+        if self.tpm > 0:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until one request using roughly this many prompt tokens fits the quota
+
+        Args:
+            tokens: Estimated prompt tokens for the request (capped at the per-minute limit)
+        """
+        if not self.enabled:
+            return
+        if self.tpm > 0:
+            tokens = min(tokens, self.tpm)
+
+        # Holding the lock while sleeping keeps waiters in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rps > 0 and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) / self.rps)
+                if self.tpm > 0 and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                logger.debug("Rate limit reached, waiting %.2fs", wait)
+                await asyncio.sleep(wait)
+            if self.rps > 0:
+                self._requests -= 1
+            if self.tpm > 0:
+                self._tokens -= tokens
@@ -0,0 +1,53 @@
+import asyncio
+import re
+import orjson
+from typing import Any, Callable, Dict, Optional
+
+# Matches a whole response wrapped in a ``` or ```json fence, capturing the body
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+# Responses longer than this (in characters) are parsed in a worker thread; below it
+# the thread hop costs more than the parse
+_THREAD_PARSE_THRESHOLD = 4096
+
+def parse_json_response(response_text: str) -> Dict[str, Any]:
+    """
+    Parse a model's JSON response, tolerating a surrounding markdown code fence
+
+    Args:
+        response_text: Raw text content returned by the model
+
+    Returns:
+        The decoded JSON object
+
+    Raises:
+        orjson.JSONDecodeError: If the payload is not valid JSON (a ValueError subclass)
+    """
+    match = _JSON_FENCE_RE.match(response_text)
+    payload = match.group(1) if match else response_text.strip()
+    return orjson.loads(payload)
+
+def _parse_and_validate(response_text: str, validate: Optional[Callable[[Any], Any]]) -> Dict[str, Any]:
+    data = parse_json_response(response_text)
+    if validate is not None:
+        validate(data)
+    return data
+
+async def parse_json_response_async(response_text: str, validate: Optional[Callable[[Any], Any]] = None) -> Dict[str, Any]:
+    """
+    Parse (and optionally validate) a model's JSON response, off the event loop for large payloads
+
+    Args:
+        response_text: Raw text content returned by the model
+        validate: Optional schema validator called with the decoded object
+
+    Returns:
+        The decoded JSON object
+
+    Raises:
+        orjson.JSONDecodeError: If the payload is not valid JSON (a ValueError subclass)
+        Exception: Whatever the validator raises for an invalid object
+    """
+    if len(response_text) > _THREAD_PARSE_THRESHOLD:
+        return await asyncio.to_thread(_parse_and_validate, response_text, validate)
+    return _parse_and_validate(response_text, validate)
@@ -0,0 +1,54 @@
+import inspect
+import logging
+from typing import Any, Callable
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt, stop_after_delay, wait_exponential_jitter
+
+logger = logging.getLogger(__name__)
+
+def is_retryable_openai_error(error: BaseException) -> bool:
+    """Rate limits, timeouts, dropped connections and 5xx from OpenAI-compatible APIs"""
+    # Imported here so this module does not pull in the SDK for other providers
+    import openai
+    return isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError))
+
+def is_retryable_genai_error(error: BaseException) -> bool:
+    """Rate limits (429) and 5xx from the Google GenAI API"""
+    from google.genai import errors
+    return isinstance(error, errors.ServerError) or (isinstance(error, errors.ClientError) and error.code == 429)
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    logger.warning(
+        "Provider call failed on attempt %d, retrying in %.1fs: %s",
+        retry_state.attempt_number, retry_state.next_action.sleep, retry_state.outcome.exception()
+    )
+
+async def call_with_retry(is_retryable: Callable[[BaseException], bool], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call a provider function, retrying transient failures with jittered exponential backoff
+    (up to 5 attempts or 90 seconds)
+
+    Args:
+        is_retryable: Predicate deciding whether an exception is transient
+        fn: The provider call; may be a coroutine function or a plain function
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        The result of fn
+
+    Raises:
+        Exception: The last error, once retries are exhausted or for a non-retryable error
+    """
+    retrying = AsyncRetrying(
+        wait=wait_exponential_jitter(initial=1, max=30),
+        stop=stop_after_attempt(5) | stop_after_delay(90),
+        retry=retry_if_exception(is_retryable),
+        before_sleep=_log_retry,
+        reraise=True
+    )
+    async for attempt in retrying:
+        with attempt:
+            result = fn(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+    return result
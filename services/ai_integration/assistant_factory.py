@@ -1,9 +1,8 @@
-from typing import Dict, Type
+import asyncio
+import functools
+from typing import Dict, Iterable
 from .base_assistant import BaseAssistant
-from .providers.openai_assistant import OpenAIAssistant
-from .providers.gemini_assistant import GeminiAssistant
-from .providers.vertexAI_assistant import VertexAIAssistant
-from .providers.open_router import OpenRouterAssistant
+from . import providers
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,18 +10,19 @@ logger = logging.getLogger(__name__)
 class AssistantFactory:
     """Factory class for creating AI assistant instances"""
     
-    _assistants: Dict[str, Type[BaseAssistant]] = {
-        "openai": OpenAIAssistant,
-        "gemini": GeminiAssistant,
-        "vertexai": VertexAIAssistant,
-        "openrouter": OpenRouterAssistant,
+    # Class names in the providers package; a provider's SDK is imported only when it is built
+    _assistants: Dict[str, str] = {
+        "openai": "OpenAIAssistant",
+        "gemini": "GeminiAssistant",
+        "vertexai": "VertexAIAssistant",
+        "openrouter": "OpenRouterAssistant",
         # Add more assistant implementations here as they are created
     }
     
     @classmethod
     def get_assistant(cls, assistant_type: str) -> BaseAssistant:
         """
-        Get an instance of the specified AI assistant
+        Get the shared instance of the specified AI assistant, building it on first use
         
         Args:
             assistant_type: The type of assistant to create (e.g., "openai", "gemini")
@@ -33,8 +33,8 @@ class AssistantFactory:
         Raises:
             ValueError: If the specified assistant type is not supported
         """
-        assistant_class = cls._assistants.get(assistant_type.lower())
-        if not assistant_class:
+        key = assistant_type.lower()
+        if key not in cls._assistants:
             supported_types = ", ".join(cls._assistants.keys())
             raise ValueError(
                 f"Unsupported assistant type: {assistant_type}. "
@@ -42,7 +42,36 @@ class AssistantFactory:
             )
             
         try:
-            return assistant_class()
+            return cls._build(key)
         except Exception as e:
-            logger.error(f"Error creating {assistant_type} assistant: {str(e)}")
-            raise 
\ No newline at end of file
+            logger.error("Error creating %s assistant: %s", assistant_type, e)
+            raise
+
+    @classmethod
+    async def warmup(cls, assistant_types: Iterable[str], timeout: float = 5.0) -> None:
+        """
+        Build the given assistants and pre-open their provider connections,
+        so the first request does not pay for SDK setup and TLS handshakes.
+        Failures are logged; the request path will retry the build.
+        
+        Args:
+            assistant_types: The assistant types to warm up (e.g., ["openai"])
+            timeout: Seconds to wait for each provider's prewarm call, so a slow or
+                     unreachable provider cannot hold up application startup
+        """
+        for assistant_type in assistant_types:
+            try:
+                assistant = cls.get_assistant(assistant_type)
+                await asyncio.wait_for(assistant.prewarm(), timeout)
+                logger.info("Warmed up %s assistant", assistant_type)
+            except asyncio.TimeoutError:
+                logger.warning("Warming up %s assistant timed out after %ss", assistant_type, timeout)
+            except Exception as e:
+                logger.warning("Could not warm up %s assistant: %s", assistant_type, e)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _build(cls, assistant_type: str) -> BaseAssistant:
+        """Instantiate an assistant once per process; failed builds are not cached"""
+        assistant_class = getattr(providers, cls._assistants[assistant_type])
+        return assistant_class() 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Any, Dict, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,14 +8,21 @@ class BaseAssistant(ABC):
     """Abstract base class for AI assistant services"""
     
     @abstractmethod
-    async def extract_financial_data(self, ocr_text: str) -> Dict:
+    async def extract_financial_data(self, ocr_text: Union[str, Dict[str, Any]]) -> Dict:
         """
         Extract financial data from OCR text
         
         Args:
-            ocr_text: The OCR text to analyze
+            ocr_text: The OCR text, or an OCR result dict, to analyze
             
         Returns:
             Dictionary containing extracted financial data
         """
-        pass 
\ No newline at end of file
+        pass
+
+    async def prewarm(self) -> None:
+        """
+        Open a connection to the provider ahead of the first request.
+        The default does nothing; providers override it with a cheap call.
+        """
+        pass
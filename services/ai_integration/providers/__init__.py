@@ -1,7 +1,23 @@
 """
 AI provider implementations package.
+
+Provider SDKs are heavy to import, so each provider module is only loaded
+when its assistant class is first accessed.
 """
-from .openai_assistant import OpenAIAssistant
-from .gemini_assistant import GeminiAssistant
+import importlib
+from typing import Any
+
+_LAZY = {
+    'OpenAIAssistant': 'openai_assistant',
+    'GeminiAssistant': 'gemini_assistant',
+    'VertexAIAssistant': 'vertexAI_assistant',
+    'OpenRouterAssistant': 'open_router',
+}
+
+__all__ = ['OpenAIAssistant', 'GeminiAssistant', 'VertexAIAssistant', 'OpenRouterAssistant']
 
-__all__ = ['OpenAIAssistant', 'GeminiAssistant']
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        module = importlib.import_module(f".{_LAZY[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,115 @@
+"""
+Request configuration shared by the OpenAI-compatible chat completions providers
+(OpenAI, OpenRouter), built once at import.
+"""
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+import openai
+import fastjsonschema
+from ..prompts import SYSTEM_PROMPT, STATIC_INSTRUCTIONS, format_ocr_block
+
+# Static message parts, built once at import; only the OCR part is per call
+_SYSTEM_MSG = {"role": "system", "content": SYSTEM_PROMPT}
+_INSTRUCTIONS_PART = {"type": "text", "text": STATIC_INSTRUCTIONS}
+
+# Response schema, built once at import
+# currentQuarter and previousYearQuarter share the same shape
+_QUARTER_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "properties": {
+        "revenueFromOps": {"type": ["number", "null"]},
+        "otherIncome": {"type": ["number", "null"]},
+        "depreciation": {"type": ["number", "null"]},
+        "financeCosts": {"type": ["number", "null"]},
+        "totalExpenses": {"type": ["number", "null"]},
+        "profitLossBeforeExceptionalItemsAndTax": {"type": ["number", "null"]},
+        "exceptionalItems": {"type": ["number", "null"]},
+        "shareOfPLOfAssociates": {"type": ["number", "null"]},
+        "profitLossBeforeTax": {"type": ["number", "null"]},
+        "profitLossAfterTaxFromOrdinaryActivities": {"type": ["number", "null"]},
+        "priorYearAdjustments": {"type": ["number", "null"]},
+        "extraOrdinaryItems": {"type": ["number", "null"]},
+        "profitLossForThePeriod": {"type": ["number", "null"]},
+        "period": {"type": "string"}
+    },
+    "required": [
+        "revenueFromOps", "depreciation", "financeCosts", "otherIncome", "totalExpenses",
+        "profitLossBeforeExceptionalItemsAndTax", "exceptionalItems",
+        "shareOfPLOfAssociates", "profitLossBeforeTax", "profitLossAfterTaxFromOrdinaryActivities",
+        "priorYearAdjustments", "extraOrdinaryItems", "profitLossForThePeriod",
+        "period"
+    ]
+}
+
+_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "currentQuarter": _QUARTER_SCHEMA,
+        "previousYearQuarter": _QUARTER_SCHEMA,
+        "revenue-format": {
+            "type": "string",
+            "enum": ["Lakhs", "Crores", "Millions"]
+        }
+    },
+    "required": ["currentQuarter", "previousYearQuarter", "revenue-format"],
+    "additionalProperties": False
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "financial_data",
+        "strict": True,
+        "schema": _RESPONSE_SCHEMA
+    }
+}
+
+# Compiled once; rejects malformed replies before they reach the report builders
+VALIDATE = fastjsonschema.compile(_RESPONSE_SCHEMA)
+
+async def stream_completion(
+    client: openai.AsyncOpenAI,
+    model: str,
+    ocr_text: Union[str, Dict[str, Any]],
+    extra_body: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Optional[int]]:
+    """
+    Request a streamed completion and join its JSON content deltas
+
+    Args:
+        client: The provider's OpenAI-compatible async client
+        model: Model name
+        ocr_text: The OCR text, or an OCR result dict, to analyze
+        extra_body: Provider-specific fields added to the request body
+
+    Returns:
+        Tuple of the response text and nanoseconds until the first content token (or None)
+    """
+    start_ns = time.perf_counter_ns()
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=(
+            _SYSTEM_MSG,
+            {"role": "user", "content": (
+                _INSTRUCTIONS_PART,
+                {"type": "text", "text": format_ocr_block(ocr_text)}
+            )}
+        ),
+        response_format=RESPONSE_FORMAT,
+        extra_body=extra_body,
+        stream=True
+    )
+
+    # Accumulate the JSON content deltas as they arrive
+    content_parts = []
+    first_token_ns = None
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if first_token_ns is None:
+                first_token_ns = time.perf_counter_ns() - start_ns
+            content_parts.append(delta)
+    return "".join(content_parts), first_token_ns
@@ -0,0 +1,269 @@
+"""
+Request configuration shared by the Google GenAI providers (Gemini, Vertex AI),
+built once at import.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, List, Literal, Optional, Tuple
+from google import genai
+from google.genai import errors, types
+from pydantic import BaseModel, Field
+from ..prompts import GEMINI_SYSTEM_PROMPT, GEMINI_STATIC_INSTRUCTIONS
+from .._parsing import parse_json_response_async
+from .._retry import call_with_retry, is_retryable_genai_error
+from .._limiter import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of the explicit context cache; it is recreated shortly before it expires
+CONTEXT_CACHE_TTL_SECONDS = 3600
+_CONTEXT_CACHE_REFRESH_MARGIN = 60
+
+# Calls per extraction when the reply fails validation; each retry feeds the error back
+MAX_VALIDATION_ATTEMPTS = 3
+
+INSTRUCTIONS_PART = types.Part.from_text(text=GEMINI_STATIC_INSTRUCTIONS)
+
+# Rough prompt size of the fixed instructions, at about four characters per token
+BASE_PROMPT_TOKENS = (len(GEMINI_SYSTEM_PROMPT) + len(GEMINI_STATIC_INSTRUCTIONS)) // 4
+
+# Current quarter and its year-over-year comparison share one shape
+_QUARTER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "revenueFromOps": { "type": "number", "nullable": True },
+        "otherIncome": { "type": "number", "nullable": True },
+        "depreciation": { "type": "number", "nullable": True },
+        "financeCosts": { "type": "number", "nullable": True },
+        "totalExpenses": { "type": "number", "nullable": True },
+        "profitLossBeforeExceptionalItemsAndTax": { "type": "number", "nullable": True },
+        "exceptionalItems": { "type": "number", "nullable": True },
+        "shareOfPLOfAssociates": { "type": "number", "nullable": True },
+        "profitLossBeforeTax": { "type": "number", "nullable": True },
+        "profitLossAfterTaxFromOrdinaryActivities": { "type": "number", "nullable": True },
+        "priorYearAdjustments": { "type": "number", "nullable": True },
+        "extraOrdinaryItems": { "type": "number", "nullable": True },
+        "profitLossForThePeriod": { "type": "number", "nullable": True },
+        "period": { "type": "string", "nullable": False }
+    },
+    "required": [
+        "revenueFromOps",
+        "otherIncome",
+        "depreciation",
+        "financeCosts",
+        "totalExpenses",
+        "profitLossBeforeExceptionalItemsAndTax",
+        "exceptionalItems",
+        "shareOfPLOfAssociates",
+        "profitLossBeforeTax",
+        "profitLossAfterTaxFromOrdinaryActivities",
+        "priorYearAdjustments",
+        "extraOrdinaryItems",
+        "profitLossForThePeriod",
+        "period"
+    ],
+    "propertyOrdering": [
+        "revenueFromOps",
+        "otherIncome",
+        "depreciation",
+        "financeCosts",
+        "totalExpenses",
+        "profitLossBeforeExceptionalItemsAndTax",
+        "exceptionalItems",
+        "shareOfPLOfAssociates",
+        "profitLossBeforeTax",
+        "profitLossAfterTaxFromOrdinaryActivities",
+        "priorYearAdjustments",
+        "extraOrdinaryItems",
+        "profitLossForThePeriod",
+        "period"
+    ]
+}
+
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "currentQuarter": _QUARTER_SCHEMA,
+        "previousYearQuarter": _QUARTER_SCHEMA,
+        "revenue-format": {
+            "type": "string",
+            "enum": ["Lakhs", "Crores", "Millions"]
+        }
+    },
+    "required": ["currentQuarter", "previousYearQuarter", "revenue-format"],
+    "propertyOrdering": ["currentQuarter", "previousYearQuarter", "revenue-format"]
+}
+
+class QuarterData(BaseModel):
+    """One quarter's metrics, mirroring _QUARTER_SCHEMA"""
+    revenueFromOps: Optional[float]
+    otherIncome: Optional[float]
+    depreciation: Optional[float]
+    financeCosts: Optional[float]
+    totalExpenses: Optional[float]
+    profitLossBeforeExceptionalItemsAndTax: Optional[float]
+    exceptionalItems: Optional[float]
+    shareOfPLOfAssociates: Optional[float]
+    profitLossBeforeTax: Optional[float]
+    profitLossAfterTaxFromOrdinaryActivities: Optional[float]
+    priorYearAdjustments: Optional[float]
+    extraOrdinaryItems: Optional[float]
+    profitLossForThePeriod: Optional[float]
+    period: str
+
+class Extraction(BaseModel):
+    """The whole reply, mirroring RESPONSE_SCHEMA"""
+    currentQuarter: QuarterData
+    previousYearQuarter: QuarterData
+    revenue_format: Literal["Lakhs", "Crores", "Millions"] = Field(alias="revenue-format")
+
+# Only the user content varies per call
+GENERATION_CONFIG = types.GenerateContentConfig(
+    max_output_tokens=2000,
+    temperature=0.1,
+    top_p=0.2,
+    response_mime_type="application/json",
+    system_instruction=[types.Part.from_text(text=GEMINI_SYSTEM_PROMPT)],
+    response_schema=RESPONSE_SCHEMA
+)
+
+class InstructionCache:
+    """
+    Explicit context cache holding the system prompt and static instructions for one
+    model, so each call only sends the OCR text. Models reject caches below their
+    minimum token count, which the fixed prompt (about BASE_PROMPT_TOKENS) is close to,
+    so the cache is only used when enabled; if creation fails it is disabled and
+    requests carry the full prompt (still eligible for the provider's implicit prefix caching).
+    """
+
+    def __init__(self, client: genai.Client, model: str, enabled: bool = False):
+        """
+        Args:
+            client: The GenAI client
+            model: Model name the cache is created for
+            enabled: Create an explicit cache; when False every request carries the full prompt
+        """
+        self._client = client
+        self._model = model
+        self._name: Optional[str] = None
+        self._expires_at = 0.0
+        self._disabled = not enabled
+        self._lock = asyncio.Lock()
+
+    async def _cache_name(self) -> Optional[str]:
+        """Return a live cache name, creating or recreating the cache as needed"""
+        if self._disabled:
+            return None
+        if self._name is not None and time.monotonic() < self._expires_at:
+            return self._name
+
+        async with self._lock:
+            if self._disabled or (self._name is not None and time.monotonic() < self._expires_at):
+                return self._name
+            try:
+                cached = await self._client.aio.caches.create(
+                    model=self._model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=GEMINI_SYSTEM_PROMPT,
+                        contents=[types.Content(role="user", parts=[INSTRUCTIONS_PART])],
+                        ttl=f"{CONTEXT_CACHE_TTL_SECONDS}s"
+                    )
+                )
+            except errors.ClientError as e:
+                # Rejected outright (e.g. prompt below the model's minimum); do not ask again
+                logger.warning("Context caching unavailable, sending the full prompt: %s", e)
+                self._disabled = True
+                self._name = None
+                return None
+            except Exception as e:
+                logger.warning("Could not create context cache, sending the full prompt: %s", e)
+                self._name = None
+                return None
+            logger.info("Created context cache %s", cached.name)
+            self._name = cached.name
+            self._expires_at = time.monotonic() + CONTEXT_CACHE_TTL_SECONDS - _CONTEXT_CACHE_REFRESH_MARGIN
+            return self._name
+
+    async def request(self, ocr_part: types.Part) -> Tuple[List[types.Content], types.GenerateContentConfig]:
+        """
+        Build the contents and config for one extraction call
+
+        Args:
+            ocr_part: The part carrying the OCR text
+
+        Returns:
+            Tuple of the request contents and the generation config
+        """
+        name = await self._cache_name()
+        if name is None:
+            return [types.Content(role="user", parts=[INSTRUCTIONS_PART, ocr_part])], GENERATION_CONFIG
+        config = GENERATION_CONFIG.model_copy(update={"system_instruction": None, "cached_content": name})
+        return [types.Content(role="user", parts=[ocr_part])], config
+
+async def _stream_text(
+    client: genai.Client,
+    model: str,
+    contents: List[types.Content],
+    config: types.GenerateContentConfig
+) -> str:
+    """Stream a generation and join its text chunks as they arrive"""
+    chunks = []
+    async for chunk in await client.aio.models.generate_content_stream(model=model, contents=contents, config=config):
+        if chunk.text:
+            chunks.append(chunk.text)
+    return "".join(chunks)
+
+def correction_contents(contents: List[types.Content], response_text: str, error: Exception) -> List[types.Content]:
+    """Append the invalid reply and the validation error as a follow-up turn asking the model to fix it"""
+    return [
+        *contents,
+        types.Content(role="model", parts=[types.Part.from_text(text=response_text)]),
+        types.Content(role="user", parts=[types.Part.from_text(
+            text=f"Your output had this error:\n{error}\nReturn the corrected JSON only."
+        )])
+    ]
+
+async def generate_extraction(
+    client: genai.Client,
+    model: str,
+    contents: List[types.Content],
+    config: types.GenerateContentConfig,
+    limiter: Optional[AsyncTokenBucket] = None,
+    estimated_tokens: int = 0
+) -> Any:
+    """
+    Request an extraction and validate the reply. An invalid reply is sent back to the
+    model with the validation error as a follow-up turn, up to MAX_VALIDATION_ATTEMPTS calls.
+
+    Args:
+        client: The GenAI client
+        model: Model name
+        contents: Request contents
+        config: Generation config
+        limiter: Optional rate limiter to wait on before each call
+        estimated_tokens: Prompt tokens to charge against the limiter per call
+
+    Returns:
+        The decoded, validated JSON object
+
+    Raises:
+        ValueError: If the last reply is still not valid JSON or does not match the schema
+    """
+    for attempt in range(MAX_VALIDATION_ATTEMPTS):
+        if limiter is not None:
+            await limiter.acquire(estimated_tokens)
+        response_text = await call_with_retry(
+            is_retryable_genai_error, _stream_text, client, model, contents, config
+        )
+        try:
+            structured_data = await parse_json_response_async(response_text)
+            Extraction.model_validate(structured_data)
+            return structured_data
+        # orjson.JSONDecodeError and pydantic.ValidationError are both ValueErrors
+        except ValueError as e:
+            if attempt == MAX_VALIDATION_ATTEMPTS - 1:
+                raise
+            logger.warning("Invalid extraction on attempt %d, asking the model to correct it: %s", attempt + 1, e)
+            contents = correction_contents(contents, response_text, e)
+            await asyncio.sleep(1.0 * (attempt + 1))
@@ -1,15 +1,30 @@
+import hashlib
+import io
 import os
-import json
-import time
-from typing import Dict
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Union
 from google import genai
 from google.genai import types
 from ..base_assistant import BaseAssistant
+from ..prompts import format_ocr_block
+from ._genai_config import InstructionCache, generate_extraction
+from .._cache import cached_extraction
+from config import SETTINGS
+from utils import timed
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+# OCR blocks longer than this (in characters) are uploaded once through the Files API
+# and referenced by URI instead of being inlined into every request
+_FILE_UPLOAD_THRESHOLD = 32_000
+_MAX_UPLOADED_FILES = 64
+
+# Per-request timeout for the GenAI client, in milliseconds
+_REQUEST_TIMEOUT_MS = 120_000
+
 class GeminiAssistant(BaseAssistant):
     """Gemini implementation of the AI assistant service"""
     
@@ -19,225 +34,66 @@ class GeminiAssistant(BaseAssistant):
         if not self.api_key:
             raise ValueError("Gemini API key not configured")
         
-        self.client = genai.Client(api_key=self.api_key)
-        
-    async def extract_financial_data(self, ocr_text: str) -> Dict:
+        self.client = genai.Client(
+            api_key=self.api_key,
+            http_options=types.HttpOptions(timeout=_REQUEST_TIMEOUT_MS)
+        )
+        self._uploaded_files: "OrderedDict[str, types.File]" = OrderedDict()
+        self._instruction_cache = InstructionCache(self.client, self.default_model, enabled=SETTINGS.GEMINI_CONTEXT_CACHE)
+
+    async def _ocr_part(self, ocr_block: str) -> types.Part:
+        """
+        Build the request part carrying the OCR block, uploading large blocks once per content hash
+
+        Args:
+            ocr_block: The wrapped OCR text
+
+        Returns:
+            An inline text part, or a file reference for blocks above the upload threshold
+        """
+        if len(ocr_block) <= _FILE_UPLOAD_THRESHOLD:
+            return types.Part.from_text(text=ocr_block)
+
+        key = hashlib.blake2b(ocr_block.encode(), digest_size=16).hexdigest()
+        uploaded = self._uploaded_files.get(key)
+        # Uploaded files expire (after 48 hours); re-upload shortly before that
+        if uploaded is None or (
+            uploaded.expiration_time is not None
+            and uploaded.expiration_time <= datetime.now(timezone.utc) + timedelta(minutes=5)
+        ):
+            uploaded = await self.client.aio.files.upload(
+                file=io.BytesIO(ocr_block.encode()),
+                config=types.UploadFileConfig(mime_type="text/plain")
+            )
+            logger.info("Uploaded %d characters of OCR text as %s", len(ocr_block), uploaded.name)
+            self._uploaded_files[key] = uploaded
+            if len(self._uploaded_files) > _MAX_UPLOADED_FILES:
+                self._uploaded_files.popitem(last=False)
+        else:
+            self._uploaded_files.move_to_end(key)
+        return types.Part.from_uri(file_uri=uploaded.uri, mime_type=uploaded.mime_type)
+
+    @cached_extraction(maxsize=SETTINGS.AI_RESULT_CACHE_SIZE)
+    async def extract_financial_data(self, ocr_text: Union[str, Dict[str, Any]]) -> Dict:
         """
         Extract financial data from OCR text using Gemini
         
         Args:
-            ocr_text: The OCR text to analyze
+            ocr_text: The OCR text, or an OCR result dict, to analyze
             
         Returns:
             Dictionary containing extracted financial data and timing information
         """
-        start_time = time.time()
         logger.info("Starting financial data extraction with Gemini")
 
         try:
-            system_prompt = """You are a specialized financial data extraction expert, trained to analyze quarterly financial statements with precision. Your purpose is to transform unstructured financial text into structured, machine-readable data.
-                                <process_instruction>
-                                    STEP 1: READ THE COMPLETE DOCUMENT FROM START TO FINISH before attempting any extraction.
-                                    STEP 2: ONLY AFTER reading the entire document, begin identifying financial metrics.
-                                </process_instruction>
-                                Your capabilities include:
-                                1. Identifying and distinguishing between current quarter and year-over-year comparison data
-                                2. Recognizing financial metrics across different terminology variations and formats
-                                3. Handling complex numerical notations (lakhs, crores, millions) and negative value representations
-                                4. Understanding the contextual relationships between financial line items
-                                5. Extracting period information from various date formats and references
-                                Extract data with accounting-level accuracy, maintaining the integrity of financial relationships. When information is genuinely missing, return null rather than attempting to derive values.
-                                <note>
-                                    1) if Profit/Loss for the Period not explicitly stated, calculate as: Profit/Loss After Tax from Ordinary Activities + Extraordinary Items (if any).
-                                    2) Extra Ordinary Items include profit/loss from discontinued operations after tax.
-                                </note>
-                                <task>
-                                    Extract these financial metrics from the PDF for both current quarter and year-over-year comparison:
-
-                                    1. Revenue from Operations
-                                    2. Other Income
-                                    3. Depreciation
-                                    4. Finance Costs
-                                    5. Total Expenses
-                                    6. Profit/Loss Before Exceptional Items and Tax
-                                    7. Exceptional Items (check postive and negative values by checking Profit/Loss Before Exceptional Items and Tax and Profit/Loss After Tax from Ordinary Activities)
-                                    8. Share of Profit/Loss of Associates
-                                    9. Profit/Loss Before Tax
-                                    10. Profit/Loss After Tax from Ordinary Activities
-                                    11. Prior Year Adjustments (not related to tax)
-                                    12. Extra Ordinary Items
-                                    13. Profit/Loss for the Period
-                                    14. Period Information (e.g., "Jan-Mar 2024")
-                                </task>
-                                <data_availability>
-                                    When year-over-year quarter comparison data (same quarter from previous year) isn't explicitly provided in the document:
-                                    1. Return null for all comparison metrics
-                                    2. Do NOT substitute with previous quarter data or any other period's data
-                                    3. Do NOT attempt to calculate or derive comparison values from other available information
-                                    This ensures data integrity by preventing incorrect period comparisons that could lead to misleading financial analysis.
-                                </data_availability>"""
+            with timed() as timing:
+                ocr_part = await self._ocr_part(format_ocr_block(ocr_text))
+                contents, config = await self._instruction_cache.request(ocr_part)
+                structured_data = await generate_extraction(self.client, self.default_model, contents, config)
             
-            user_prompt = f"""<context>
-                            Analyze the following quarterly financial statement text and extract the financial metrics for both current quarter and year-over-year comparison quarter.
-                            </context>
-
-                            Here is the quarterly financial result page OCR text:
-                            {ocr_text}"""
-            
-            response = self.client.models.generate_content(
-                model=self.default_model,
-                contents = [
-                    types.Content(
-                        role="user",
-                            parts=[
-                                types.Part.from_text(text=user_prompt),
-                            ],
-                )],
-                config=types.GenerateContentConfig(
-                    max_output_tokens=2000,
-                    temperature=0.1,
-                    top_p=0.2,
-                    response_mime_type="application/json",
-                    system_instruction=[
-                        types.Part.from_text(text=system_prompt),
-                    ],
-                    response_schema={
-                        "type": "object",
-                        "properties": {
-                            "currentQuarter": {
-                                "type": "object",
-                                "properties": {
-                                    "revenueFromOps": { "type": "number", "nullable": True },
-                                    "otherIncome": { "type": "number", "nullable": True },
-                                    "depreciation": { "type": "number", "nullable": True },
-                                    "financeCosts": { "type": "number", "nullable": True },
-                                    "totalExpenses": { "type": "number", "nullable": True },
-                                    "profitLossBeforeExceptionalItemsAndTax": { "type": "number", "nullable": True },
-                                    "exceptionalItems": { "type": "number", "nullable": True },
-                                    "shareOfPLOfAssociates": { "type": "number", "nullable": True },
-                                    "profitLossBeforeTax": { "type": "number", "nullable": True },
-                                    "profitLossAfterTaxFromOrdinaryActivities": { "type": "number", "nullable": True },
-                                    "priorYearAdjustments": { "type": "number", "nullable": True },
-                                    "extraOrdinaryItems": { "type": "number", "nullable": True },
-                                    "profitLossForThePeriod": { "type": "number", "nullable": True },
-                                    "period": { "type": "string", "nullable": False }
-                                },
-                                "required": [
-                                    "revenueFromOps",
-                                    "otherIncome",
-                                    "depreciation",
-                                    "financeCosts",
-                                    "totalExpenses",
-                                    "profitLossBeforeExceptionalItemsAndTax",
-                                    "exceptionalItems",
-                                    "shareOfPLOfAssociates",
-                                    "profitLossBeforeTax",
-                                    "profitLossAfterTaxFromOrdinaryActivities",
-                                    "priorYearAdjustments",
-                                    "extraOrdinaryItems",
-                                    "profitLossForThePeriod",
-                                    "period"
-                                ],
-                                "propertyOrdering": [
-                                    "revenueFromOps",
-                                    "otherIncome",
-                                    "depreciation",
-                                    "financeCosts",
-                                    "totalExpenses",
-                                    "profitLossBeforeExceptionalItemsAndTax",
-                                    "exceptionalItems",
-                                    "shareOfPLOfAssociates",
-                                    "profitLossBeforeTax",
-                                    "profitLossAfterTaxFromOrdinaryActivities",
-                                    "priorYearAdjustments",
-                                    "extraOrdinaryItems",
-                                    "profitLossForThePeriod",
-                                    "period"
-                                ]
-                            },
-                            "previousYearQuarter": {
-                                "type": "object",
-                                "properties": {
-                                    "revenueFromOps": { "type": "number", "nullable": True },
-                                    "otherIncome": { "type": "number", "nullable": True },
-                                    "depreciation": { "type": "number", "nullable": True },
-                                    "financeCosts": { "type": "number", "nullable": True },
-                                    "totalExpenses": { "type": "number", "nullable": True },
-                                    "profitLossBeforeExceptionalItemsAndTax": { "type": "number", "nullable": True },
-                                    "exceptionalItems": { "type": "number", "nullable": True },
-                                    "shareOfPLOfAssociates": { "type": "number", "nullable": True },
-                                    "profitLossBeforeTax": { "type": "number", "nullable": True },
-                                    "profitLossAfterTaxFromOrdinaryActivities": { "type": "number", "nullable": True },
-                                    "priorYearAdjustments": { "type": "number", "nullable": True },
-                                    "extraOrdinaryItems": { "type": "number", "nullable": True },
-                                    "profitLossForThePeriod": { "type": "number", "nullable": True },
-                                    "period": { "type": "string", "nullable": False }
-                                },
-                                "required": [
-                                    "revenueFromOps",
-                                    "otherIncome",
-                                    "depreciation",
-                                    "financeCosts",
-                                    "totalExpenses",
-                                    "profitLossBeforeExceptionalItemsAndTax",
-                                    "exceptionalItems",
-                                    "shareOfPLOfAssociates",
-                                    "profitLossBeforeTax",
-                                    "profitLossAfterTaxFromOrdinaryActivities",
-                                    "priorYearAdjustments",
-                                    "extraOrdinaryItems",
-                                    "profitLossForThePeriod",
-                                    "period"
-                                ],
-                                "propertyOrdering": [
-                                    "revenueFromOps",
-                                    "otherIncome",
-                                    "depreciation",
-                                    "financeCosts",
-                                    "totalExpenses",
-                                    "profitLossBeforeExceptionalItemsAndTax",
-                                    "exceptionalItems",
-                                    "shareOfPLOfAssociates",
-                                    "profitLossBeforeTax",
-                                    "profitLossAfterTaxFromOrdinaryActivities",
-                                    "priorYearAdjustments",
-                                    "extraOrdinaryItems",
-                                    "profitLossForThePeriod",
-                                    "period"
-                                ]
-                            },
-                            "revenue-format": {
-                                "type": "string",
-                                "enum": ["Lakhs", "Crores", "Millions"]
-                            }
-                        },
-                        "required": ["currentQuarter", "previousYearQuarter", "revenue-format"],
-                        "propertyOrdering": ["currentQuarter", "previousYearQuarter", "revenue-format"]
-                    }
-                )
-            )
-            
-            end_time = time.time()
-            processing_time = end_time - start_time
-            
-            structured_data = json.loads(response.text)
-            
-            return {
-                "data": structured_data,
-                "timing": {
-                    "start": start_time,
-                    "end": end_time,
-                    "duration": processing_time
-                }
-            }
+            return {"data": structured_data, "timing": timing}
             
         except Exception as e:
-            logger.error(f"Error in financial data extraction: {str(e)}")
-            raise 
-
-
-
-
-
-
-
+            logger.error("Error in financial data extraction: %s", e)
+            raise
@@ -1,13 +1,22 @@
 import os
-import json
-import time
-from typing import Dict
+from typing import Any, Dict, Union
 import openai
 from ..base_assistant import BaseAssistant
+from .._parsing import parse_json_response_async
+from ._chat_completions import VALIDATE, stream_completion
+from .._cache import cached_extraction
+from .._retry import call_with_retry, is_retryable_openai_error
+from config import SETTINGS
+from utils import timed
+from .._http import get_shared_httpx_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Only route to upstream providers that honour response_format, so the
+# reply is schema-constrained JSON rather than free text
+_EXTRA_BODY = {"provider": {"require_parameters": True}}
+
 class OpenRouterAssistant(BaseAssistant):
     """OpenRouter implementation of the AI assistant service"""
     
@@ -20,155 +29,40 @@ class OpenRouterAssistant(BaseAssistant):
         self.client = openai.AsyncOpenAI(
             base_url="https://openrouter.ai/api/v1",
             api_key=self.api_key,
+            http_client=get_shared_httpx_client(),
+            # Retries are handled by call_with_retry
+            max_retries=0,
         )
         
             
-    async def extract_financial_data(self, ocr_text: str) -> Dict:
+    async def prewarm(self) -> None:
+        """List models to complete the TLS handshake and fill the shared connection pool"""
+        await self.client.models.list()
+
+    @cached_extraction(maxsize=SETTINGS.AI_RESULT_CACHE_SIZE)
+    async def extract_financial_data(self, ocr_text: Union[str, Dict[str, Any]]) -> Dict:
         """
         Extract financial data from OCR text using OpenRouter
         
         Args:
-            ocr_text: The OCR text to analyze
+            ocr_text: The OCR text, or an OCR result dict, to analyze
             
         Returns:
             Dictionary containing extracted financial data and timing information
         """
-        start_time = time.time()
         logger.info("Starting financial data extraction with OpenRouter")
         
         try:
-            system_prompt = """You are a financial analyst specializing in quarterly financial statements. 
-Your primary task is to extract and structure financial metrics from company documents.
-You must be precise and methodical in your analysis.
-You understand financial reporting standards and number notation (lakhs, crores).
-Important term clarifications:
-- priorYearAdjustments: Adjustments to previous financial periods not related to tax.
-- extraOrdinaryItems: Unusual one-time events (discontinued operations after tax also included).
-You must respond in valid JSON format."""
-            
-            user_prompt = f"""You are analyzing a company's quarterly financial statement. Extract both the current quarter and its year-over-year comparison data.
-
-Extract financial metrics for both the latest quarter and its year-over-year (YoY) comparison from the provided text.
-If any information is not found, return null for that field.
-
-Follow these extraction rules:
-1. Period identification:
-   - Look for month ranges (Jan-Mar, January-March, etc.)
-   - Look for date ranges (1st Jan - 31st Mar, 01/01/2024 - 31/03/2024)
-   - Three month period references
-   - Identify both current and previous year periods
-
-2. Value extraction:
-   - Extract numbers in lakhs, crores, or millions notation
-   - Handle numbers with commas and decimals
-   - Use negative numbers for losses
-   - Set to null if value not found
-
-3. Output format:
-   - Return the data in JSON format
-   - Follow the exact structure specified in the schema
-
-Text to analyze:
-{ocr_text}"""
-            
-            response = await self.client.chat.completions.create(
-                model=self.default_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "financial_data",
-                        "strict": True,
-                        "schema": {
-                            "type": "object",
-                            "properties": {
-                                "currentQuarter": {
-                                    "type": "object",
-                                    "additionalProperties": False,
-                                    "properties": {
-                                        "revenueFromOps": {"type": ["number", "null"]},
-                                        "otherIncome": {"type": ["number", "null"]},
-                                        "depreciation": {"type": ["number", "null"]},
-                                        "financeCosts": {"type": ["number", "null"]},
-                                        "totalExpenses": {"type": ["number", "null"]},
-                                        "profitLossBeforeExceptionalItemsAndTax": {"type": ["number", "null"]},
-                                        "exceptionalItems": {"type": ["number", "null"]},
-                                        "shareOfPLOfAssociates": {"type": ["number", "null"]},
-                                        "profitLossBeforeTax": {"type": ["number", "null"]},
-                                        "profitLossAfterTaxFromOrdinaryActivities": {"type": ["number", "null"]},
-                                        "priorYearAdjustments": {"type": ["number", "null"]},
-                                        "extraOrdinaryItems": {"type": ["number", "null"]},
-                                        "profitLossForThePeriod": {"type": ["number", "null"]},
-                                        "period": {"type": "string"}
-                                    },
-                                    "required": [
-                                        "revenueFromOps", "depreciation", "financeCosts", "otherIncome", "totalExpenses",
-                                        "profitLossBeforeExceptionalItemsAndTax", "exceptionalItems",
-                                        "shareOfPLOfAssociates", "profitLossBeforeTax", "profitLossAfterTaxFromOrdinaryActivities",
-                                        "priorYearAdjustments", "extraOrdinaryItems", "profitLossForThePeriod",
-                                        "period"
-                                    ]
-                                },
-                                "previousYearQuarter": {
-                                    "type": "object",
-                                    "additionalProperties": False,
-                                    "properties": {
-                                        "revenueFromOps": {"type": ["number", "null"]},
-                                        "otherIncome": {"type": ["number", "null"]},
-                                        "depreciation": {"type": ["number", "null"]},
-                                        "financeCosts": {"type": ["number", "null"]},
-                                        "totalExpenses": {"type": ["number", "null"]},
-                                        "profitLossBeforeExceptionalItemsAndTax": {"type": ["number", "null"]},
-                                        "exceptionalItems": {"type": ["number", "null"]},
-                                        "shareOfPLOfAssociates": {"type": ["number", "null"]},
-                                        "profitLossBeforeTax": {"type": ["number", "null"]},
-                                        "profitLossAfterTaxFromOrdinaryActivities": {"type": ["number", "null"]},
-                                        "priorYearAdjustments": {"type": ["number", "null"]},
-                                        "extraOrdinaryItems": {"type": ["number", "null"]},
-                                        "profitLossForThePeriod": {"type": ["number", "null"]},
-                                        "period": {"type": "string"}
-                                    },
-                                    "required": [
-                                        "revenueFromOps", "depreciation", "financeCosts", "otherIncome", "totalExpenses",
-                                        "profitLossBeforeExceptionalItemsAndTax", "exceptionalItems",
-                                        "shareOfPLOfAssociates", "profitLossBeforeTax", "profitLossAfterTaxFromOrdinaryActivities",
-                                        "priorYearAdjustments", "extraOrdinaryItems", "profitLossForThePeriod",
-                                        "period"
-                                    ]
-                                },
-                                "revenue-format": {
-                                    "type": "string",
-                                    "enum": ["Lakhs", "Crores", "Millions"]
-                                }
-                            },
-                            "required": ["currentQuarter", "previousYearQuarter", "revenue-format"],
-                            "additionalProperties": False
-                        }
-                    }
-                }
-            )
-            
-            #logger.info(f"Response: {response}")
-            
-            end_time = time.time()
-            processing_time = end_time - start_time
-            
-            # For chat.completions.create(), the response structure is:
-            # response.choices[0].message.content contains the JSON string
-            structured_data = json.loads(response.choices[0].message.content)
+            with timed() as timing:
+                response_text, first_token_ns = await call_with_retry(
+                    is_retryable_openai_error, stream_completion, self.client, self.default_model, ocr_text,
+                    extra_body=_EXTRA_BODY
+                )
+                structured_data = await parse_json_response_async(response_text, VALIDATE)
+            timing["time_to_first_token"] = first_token_ns / 1e9 if first_token_ns is not None else None
             
-            return {
-                "data": structured_data,
-                "timing": {
-                    "start": start_time,
-                    "end": end_time,
-                    "duration": processing_time
-                }
-            }
+            return {"data": structured_data, "timing": timing}
             
         except Exception as e:
-            logger.error(f"Error in financial data extraction: {str(e)}")
+            logger.error("Error in financial data extraction: %s", e)
             raise 
\ No newline at end of file
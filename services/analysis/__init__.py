@@ -4,5 +4,6 @@ Analysis service package for handling data analysis functionality.
 from .page_classifier import PageClassifier
 from .text_analyzer import TextAnalyzer
 from .result_type_config import ResultTypeConfig
+from .analyzed_page import AnalyzedPage
 
-__all__ = ['PageClassifier', 'TextAnalyzer', 'ResultTypeConfig'] 
\ No newline at end of file
+__all__ = ['PageClassifier', 'TextAnalyzer', 'ResultTypeConfig', 'AnalyzedPage'] 
\ No newline at end of file
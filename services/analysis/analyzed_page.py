@@ -0,0 +1,22 @@
+from typing import Tuple, Union
+import msgspec
+
+class AnalyzedPage(msgspec.Struct, gc=False):
+    """
+    Term analysis and classification of one page. Encodes to the same JSON object
+    the API has always returned for each page.
+
+    Instances only hold strings, numbers and a tuple of strings, so they can never
+    be part of a reference cycle and are left out of garbage collector tracking.
+    """
+    page_number: int
+    text: str
+    isRelevant: bool
+    foundTerms: Tuple[str, ...]
+    foundTermsCount: int
+    uniqueTermsCount: int
+    classification: str = "Unknown"
+    isOcr: bool = False
+    # Set by PageClassifier.classify_pages; left out of the response until then
+    zScore: Union[float, msgspec.UnsetType] = msgspec.UNSET
+    isOutlier: Union[bool, msgspec.UnsetType] = msgspec.UNSET
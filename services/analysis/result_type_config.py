@@ -1,6 +1,6 @@
 from dataclasses import dataclass
-from typing import Optional
-import json
+from typing import Any, Dict, Optional
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,7 +30,31 @@ class ResultTypeConfig:
             return cls(result_type="single_page")
             
         try:
-            data = json.loads(stock_data)
+            data = orjson.loads(stock_data)
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid stock data JSON: {str(e)}")
+            raise ValueError("Invalid stock data format")
+        return cls.from_stock_data_dict(data)
+
+    @classmethod
+    def from_stock_data_dict(cls, data: Dict[str, Any]) -> 'ResultTypeConfig':
+        """
+        Create a ResultTypeConfig instance from already parsed stock data
+        
+        Args:
+            data: Stock data dictionary containing resultPageConfig
+            
+        Returns:
+            ResultTypeConfig instance
+            
+        Raises:
+            ValueError: If stock data is missing required fields
+        """
+        if not data:
+            logger.warning("No stock data provided, using default configuration")
+            return cls(result_type="single_page")
+            
+        try:
             result_config = data.get('resultPageConfig', {})
             
             # Map the input type to our internal types
@@ -52,9 +76,6 @@ class ResultTypeConfig:
                 multi_page_type=multi_page_type
             )
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid stock data JSON: {str(e)}")
-            raise ValueError("Invalid stock data format")
         except Exception as e:
             logger.error(f"Error parsing stock data: {str(e)}")
             raise ValueError("Failed to parse stock data") 
\ No newline at end of file
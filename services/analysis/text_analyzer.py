@@ -1,16 +1,19 @@
 import re
-from typing import List, Dict, Set
-import os
-from dotenv import load_dotenv
+from typing import List, Dict, Set, Tuple
 from .page_classifier import PageClassifier
 import logging
+import ahocorasick
 from services.analysis.result_type_config import ResultTypeConfig
-
-# Load environment variables from .env file
-load_dotenv()
+from services.analysis.analyzed_page import AnalyzedPage
+from config import SETTINGS
 
 logger = logging.getLogger(__name__)
 
+# Minimum number of financial terms to consider a page relevant
+_MIN_FINANCIAL_TERMS = SETTINGS.MIN_FINANCIAL_TERMS
+# Minimum number of financial terms for a Results Page to be accepted without OCR
+_RESULTS_PAGE_MIN_TERMS = 10
+
 class TextAnalyzer:
     FINANCIAL_TERMS = [
         r'\bRevenue from operations\b',
@@ -36,9 +39,40 @@ class TextAnalyzer:
         r'\bValue\b', 
         r'\b(lakhs?|Millions?|crores?)\b'
     ]
-    
+
+    # Lowercase spellings of each term above, in the same order; the plural
+    # variants of the last (regex) term are listed explicitly
+    _TERM_SPELLINGS = (
+        ('revenue from operations',),
+        ('other income',),
+        ('total income',),
+        ('expense',),
+        ('finance costs',),
+        ('depreciation',),
+        ('before tax',),
+        ('profit before tax',),
+        ('exceptional',),
+        ('tax expense',),
+        ('current tax',),
+        ('deferred tax',),
+        ('net income',),
+        ('comprehensive income',),
+        ('reclassified',),
+        ('attributable to',),
+        ('controlling',),
+        ('diluted',),
+        ('equity share',),
+        ('profit after tax',),
+        ('value',),
+        ('lakh', 'lakhs', 'million', 'millions', 'crore', 'crores'),
+    )
+
+    # Compiled once. Only used for text whose lowercase form changes length, where
+    # offsets from the automaton would not line up with the original text
+    _COMPILED_TERMS = tuple(re.compile(term, re.IGNORECASE) for term in FINANCIAL_TERMS)
+
     # Configuration parameter loaded from environment variables
-    MIN_FINANCIAL_TERMS = int(os.getenv('MIN_FINANCIAL_TERMS'))  # Minimum number of financial terms to consider a page relevant
+    MIN_FINANCIAL_TERMS = _MIN_FINANCIAL_TERMS  # Minimum number of financial terms to consider a page relevant
     
     @staticmethod
     def find_unique_terms(text: str) -> Set[str]:
@@ -51,16 +85,34 @@ class TextAnalyzer:
         3. Store the actual matched term if found
         4. Return the set of unique terms found
         """
-        found_terms: Set[str] = set()
-        for term in TextAnalyzer.FINANCIAL_TERMS:
-            if re.search(term, text, re.IGNORECASE):
-                # Store the actual matched term
-                found_term = re.search(term, text, re.IGNORECASE).group(0)
-                found_terms.add(found_term)
-        return found_terms
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            found_terms: Set[str] = set()
+            for pattern in TextAnalyzer._COMPILED_TERMS:
+                match = pattern.search(text)
+                if match:
+                    # Store the actual matched term
+                    found_terms.add(match.group(0))
+            return found_terms
+
+        # One pass over the text reports every occurrence, overlapping ones included
+        # ("Before Tax" inside "Profit before tax"); keep the first whole-word match per term
+        first_matches: Dict[int, Tuple[int, int]] = {}
+        last_index = len(lowered) - 1
+        for end, (term_index, length) in _TERM_AUTOMATON.iter(lowered):
+            start = end - length + 1
+            if start > 0 and _is_word_char(lowered[start - 1]):
+                continue
+            if end < last_index and _is_word_char(lowered[end + 1]):
+                continue
+            if term_index not in first_matches or start < first_matches[term_index][0]:
+                first_matches[term_index] = (start, end + 1)
+
+        # Store the actual matched terms, in their original case
+        return {text[start:end] for start, end in first_matches.values()}
 
     @staticmethod
-    def analyze_page(text: str, page_number: int, is_ocr: bool = False) -> Dict:
+    def analyze_page(text: str, page_number: int, is_ocr: bool = False) -> AnalyzedPage:
         """
         Analyze a single page of text for financial terms and classification.
         
@@ -79,22 +131,22 @@ class TextAnalyzer:
         unique_terms_count = len(found_terms)
         
         # Step 3: Determine if page is relevant
-        is_relevant = unique_terms_count >= TextAnalyzer.MIN_FINANCIAL_TERMS
+        is_relevant = unique_terms_count >= _MIN_FINANCIAL_TERMS
         
         # Step 4: Initialize classification (will be updated later by PageClassifier)
         classification = "Unknown"
         
         # Step 5: Return analysis results
-        return {
-            "page_number": page_number,  # Keep original page number
-            "text": text,
-            "isRelevant": is_relevant,
-            "foundTerms": list(found_terms),
-            "foundTermsCount": unique_terms_count,
-            "uniqueTermsCount": unique_terms_count,  # Using unique count instead of frequency
-            "classification": classification,
-            "isOcr": is_ocr  # Preserve OCR flag
-        }
+        return AnalyzedPage(
+            page_number=page_number,  # Keep original page number
+            text=text,
+            isRelevant=is_relevant,
+            foundTerms=tuple(found_terms),
+            foundTermsCount=unique_terms_count,
+            uniqueTermsCount=unique_terms_count,  # Using unique count instead of frequency
+            classification=classification,
+            isOcr=is_ocr  # Preserve OCR flag
+        )
 
     @staticmethod
     def analyze_document(pages: List[Dict[str, str]], result_type_config: ResultTypeConfig) -> Dict:
@@ -119,29 +171,59 @@ class TextAnalyzer:
             Dictionary containing analysis results
         """
         analyzed_pages = []
-        unique_terms_counts = []
         
         # Step 1: First pass - analyze pages and collect unique term counts
         for page in pages:
             page_number = page.get('page_number', 0)  # Keep original page number
             text = page.get('text', '')
             is_ocr = page.get('isOcr', False)
-            analyzed_page = TextAnalyzer.analyze_page(text, page_number, is_ocr)
-            analyzed_pages.append(analyzed_page)
-            unique_terms_counts.append(analyzed_page['uniqueTermsCount'])
+            analyzed_pages.append(TextAnalyzer.analyze_page(text, page_number, is_ocr))
         
+        return TextAnalyzer.classify_document(analyzed_pages, result_type_config)
+
+    @staticmethod
+    def classify_document(
+        analyzed_pages: List[AnalyzedPage],
+        result_type_config: ResultTypeConfig,
+        skip_unqualified: bool = False
+    ) -> Dict:
+        """
+        Classify pages already analyzed with analyze_page (steps 2-8 of analyze_document).
+
+        Args:
+            analyzed_pages: Per-page results from analyze_page, in page order
+            result_type_config: Configuration for result page type detection
+            skip_unqualified: Return needs_ocr without classifying when no page has enough
+                              terms to be an accepted Results Page. Only for a pass whose
+                              classifications are discarded when OCR is needed
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        unique_terms_counts = [page.uniqueTermsCount for page in analyzed_pages]
+        max_terms = max(unique_terms_counts, default=0)
+
         # Step 2: Check if any page has financial terms >= MIN_FINANCIAL_TERMS, if not, return True for needs_ocr
-        if not any(page['uniqueTermsCount'] >= TextAnalyzer.MIN_FINANCIAL_TERMS for page in analyzed_pages):
+        if max_terms < _MIN_FINANCIAL_TERMS:
             return {
                 "needs_ocr": True,
                 "message": "PDF needs to be processed through OCR API to get data",
                 "pages": analyzed_pages
             }
+
+        # Step 2.1: Step 5 would require OCR anyway if no page reaches the Results Page minimum
+        if skip_unqualified and max_terms < _RESULTS_PAGE_MIN_TERMS:
+            logger.info(f"OCR triggered: No page has at least {_RESULTS_PAGE_MIN_TERMS} unique terms")
+            return {
+                "needs_ocr": True,
+                "message": "Results Page doesn't have enough unique terms, needs OCR processing",
+                "pages": analyzed_pages
+            }
         '''
         # Step 3: Check for two Relevant pages in multi_page mode, if not, return True for needs_ocr
         if PageClassifier.RESULT_TYPE == "multi_page":
             # Step 3.1: Check if only one Relevant page in multi_page mode
-            relevant_pages = [p for p in analyzed_pages if p['isRelevant']]
+            relevant_pages = [p for p in analyzed_pages if p.isRelevant]
             if len(relevant_pages) == 1:
                 return {
                     "needs_ocr": True,
@@ -152,7 +234,7 @@ class TextAnalyzer:
             # Step 3.2: Check if difference between highest and second-highest term pages > 10 and second-highest term pages < 10 in multi_page
             if len(relevant_pages) >= 2:
                 # Sort relevant pages by unique terms count in descending order
-                sorted_pages = sorted(relevant_pages, key=lambda x: x['uniqueTermsCount'], reverse=True)
+                sorted_pages = sorted(relevant_pages, key=lambda x: x.uniqueTermsCount, reverse=True)
                 highest_terms = sorted_pages[0]['uniqueTermsCount']
                 second_highest_terms = sorted_pages[1]['uniqueTermsCount']
                 
@@ -169,9 +251,17 @@ class TextAnalyzer:
         stats = PageClassifier.calculate_statistics(unique_terms_counts)
         analyzed_pages = PageClassifier.classify_pages(analyzed_pages, stats, result_type_config)
         
-        # Step 5: Check if document needs OCR based on Results Page criteria
-        results_pages = [page for page in analyzed_pages if page.get('classification') == "Results Page"]
-        if not results_pages:
+        # Step 5: Check if document needs OCR based on Results Page criteria, in a single pass
+        has_results_page = False
+        has_sufficient_results_page = False
+        for page in analyzed_pages:
+            if page.classification == "Results Page":
+                has_results_page = True
+                if page.uniqueTermsCount >= _RESULTS_PAGE_MIN_TERMS:
+                    has_sufficient_results_page = True
+                    break
+
+        if not has_results_page:
             logger.info("OCR triggered: No 'Results Page' found in any analyzed page")
             return {
                 "needs_ocr": True,
@@ -180,7 +270,7 @@ class TextAnalyzer:
             }
         else:
             # Verify that Results Page has sufficient financial terms (>= 10)
-            if not any(page.get('uniqueTermsCount', 0) >= 10 for page in results_pages):
+            if not has_sufficient_results_page:
                 logger.info("OCR triggered: 'Results Page' found but doesn't have at least 10 unique terms")
                 return {
                     "needs_ocr": True,
@@ -191,8 +281,8 @@ class TextAnalyzer:
         # Step 6: Check if any outlier page has "Classification Failed" status
         '''
         for page in analyzed_pages:
-            if page.get('isOutlier', False) and "Classification Failed" in page.get('classification', ''):
-                logger.info(f"OCR triggered: Outlier page {page['page_number']} has 'Classification Failed' status")
+            if page.isOutlier is True and "Classification Failed" in page.classification:
+                logger.info(f"OCR triggered: Outlier page {page.page_number} has 'Classification Failed' status")
                 return {
                     "needs_ocr": True,
                     "message": "Classification failed for outlier page, needs OCR processing",
@@ -203,7 +293,7 @@ class TextAnalyzer:
         '''
         if PageClassifier.RESULT_TYPE == "multi_page":
             relevant_pages = [page for page in analyzed_pages 
-                             if page['classification'] != "Not Relevant with zScore"]
+                             if page.classification != "Not Relevant with zScore"]
             
             if len(relevant_pages) <= 1:
                 logger.info(f"OCR triggered: Not enough relevant pages found in multi_page mode. Found only {len(relevant_pages)} relevant page(s).")
@@ -219,4 +309,22 @@ class TextAnalyzer:
             "needs_ocr": False,
             "message": "PDF processed successfully",
             "pages": analyzed_pages
-        } 
\ No newline at end of file
+        } 
+
+
+def _is_word_char(char: str) -> bool:
+    """Whether a character counts as part of a word for the regex \\b boundary"""
+    return char.isalnum() or char == '_'
+
+
+def _build_term_automaton() -> ahocorasick.Automaton:
+    """Build the automaton matching every spelling of every financial term"""
+    automaton = ahocorasick.Automaton()
+    for term_index, spellings in enumerate(TextAnalyzer._TERM_SPELLINGS):
+        for spelling in spellings:
+            automaton.add_word(spelling, (term_index, len(spelling)))
+    automaton.make_automaton()
+    return automaton
+
+
+_TERM_AUTOMATON = _build_term_automaton()
@@ -1,11 +1,85 @@
 import logging
+import struct
+import zlib
 import pymupdf
 
 logger = logging.getLogger(__name__)
 
+# zlib level for result page PNGs. Rendered text pages are mostly flat background, so
+# level 1 costs little in size and encodes several times faster than the default
+PNG_COMPRESS_LEVEL = 1
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG color type by number of color components (grayscale, RGB)
+_PNG_COLOR_TYPES = {1: 0, 3: 2}
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Frame one PNG chunk: length, type, data and CRC"""
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def encode_png(pixmap: pymupdf.Pixmap, compress_level: int = PNG_COMPRESS_LEVEL) -> bytes:
+    """Encode a pixmap as PNG with the given zlib compression level
+
+    PyMuPDF's own PNG writer always uses zlib's default level, which dominates the
+    time spent creating a result image. Pixmaps with alpha or an unusual colorspace
+    are left to PyMuPDF.
+
+    Args:
+        pixmap: Rendered page, 8 bits per component
+        compress_level: zlib compression level (0-9)
+
+    Returns:
+        bytes of the PNG image
+    """
+    color_type = _PNG_COLOR_TYPES.get(pixmap.n)
+    if color_type is None or pixmap.alpha:
+        return pixmap.tobytes("png")
+
+    width, height, stride = pixmap.width, pixmap.height, pixmap.stride
+    row_size = width * pixmap.n
+    # Scanlines are fed to zlib straight from the pixmap's buffer, without
+    # copying the samples or assembling the filtered image first
+    samples = pixmap.samples_mv
+    compressor = zlib.compressobj(compress_level)
+    compressed = []
+    for offset in range(0, height * stride, stride):
+        # Every scanline is prefixed with its filter type, 0 (None)
+        compressed.append(compressor.compress(b"\x00"))
+        compressed.append(compressor.compress(samples[offset:offset + row_size]))
+    compressed.append(compressor.flush())
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    # Resolution in pixels per metre, as PyMuPDF writes it
+    resolution = struct.pack(">IIB", round(pixmap.xres / 0.0254), round(pixmap.yres / 0.0254), 1)
+    return b"".join((
+        _PNG_SIGNATURE,
+        _png_chunk(b"IHDR", header),
+        _png_chunk(b"pHYs", resolution),
+        _png_chunk(b"IDAT", b"".join(compressed)),
+        _png_chunk(b"IEND", b""),
+    ))
+
+
 class ResultImageCreator:
-    def __init__(self):
-        pass
+    def __init__(self, dpi: int = 150, max_dimension: int = 2400):
+        """
+        Args:
+            dpi: Rendering resolution; 150 DPI is the minimum Textract recommends
+            max_dimension: Upper bound in pixels for the longer side of the image,
+                           lowering the resolution for oversized pages
+        """
+        self.dpi = dpi
+        self.max_dimension = max_dimension
+
+    def _page_dpi(self, page: pymupdf.Page) -> int:
+        """Resolution for a page: the configured DPI, capped by max_dimension"""
+        # Page sizes are in points, 72 per inch
+        longest_side = max(page.rect.width, page.rect.height)
+        if longest_side <= 0:
+            return self.dpi
+        return max(1, min(self.dpi, int(self.max_dimension * 72 / longest_side)))
 
     def create_result_image(self, source_pdf: pymupdf.Document, result_page_num: int) -> bytes:
         """Create an image from a single PDF page and return as bytes
@@ -24,11 +98,11 @@ class ResultImageCreator:
             # Load the specific page
             page = source_pdf.load_page(page_index)
             
-            # Create pixmap with default settings
-            pixmap = page.get_pixmap(dpi=200, colorspace=pymupdf.csGRAY)
+            # Render in grayscale; pixel count, and so rendering and encoding work, grows with DPI squared
+            pixmap = page.get_pixmap(dpi=self._page_dpi(page), colorspace=pymupdf.csGRAY)
 
             # Convert to PNG bytes
-            image_bytes = pixmap.tobytes("png")
+            image_bytes = encode_png(pixmap)
             
             return image_bytes
 
@@ -4,5 +4,6 @@ Notifications service package for handling notification functionality.
 from .extraction_status_formatter import ExtractionStatusFormatter
 from .telegram_notification_service import TelegramNotificationService
 from .financial_report_builder import FinancialReportBuilder
+from .notification_queue import NotificationQueue, notification_queue
 
-__all__ = ['ExtractionStatusFormatter', 'TelegramNotificationService', 'FinancialReportBuilder'] 
\ No newline at end of file
+__all__ = ['ExtractionStatusFormatter', 'TelegramNotificationService', 'FinancialReportBuilder', 'NotificationQueue', 'notification_queue'] 
\ No newline at end of file
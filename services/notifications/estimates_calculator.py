@@ -1,51 +1,56 @@
-from typing import Dict, Optional
+from typing import Dict, Tuple
+import bisect
 import logging
 from datetime import datetime
-from .financial_calculations import FinancialCalculations
+from .financial_calculations import CRORE_DIVISORS, FinancialCalculations
 
 logger = logging.getLogger(__name__)
 
+# Classification of a value by how many boundaries it has reached
+_CLASSIFICATIONS = ("Below Avg", "Avg", "Good", "Very Good", "Blockbuster")
+
+# Quarter fields read by FinancialCalculations.calculate_operating_income
+_OPERATING_INCOME_FIELDS = ("revenueFromOps", "totalExpenses", "depreciation", "financeCosts", "shareOfPLOfAssociates")
+
+# Required fields (name, description) of each section of the input data
+_REQUIRED_QUARTER_FIELDS = (
+    ("revenueFromOps", "Revenue from operations"),
+    ("totalExpenses", "Total expenses"),
+    ("depreciation", "Depreciation"),
+    ("financeCosts", "Finance costs"),
+)
+_REQUIRED_BASELINE_FIELDS = (
+    ("previousSalesNumber", "Previous sales number"),
+)
+_REQUIRED_SALES_GROWTH_FIELDS = (
+    ("lowestSalesGrowthPercent", "Lowest sales growth estimate"),
+    ("highestSalesGrowthPercent", "Highest sales growth estimate"),
+)
+_REQUIRED_MARGIN_FIELDS = (
+    ("lowestMarginEstimate", "Lowest margin estimate"),
+    ("highestMarginEstimate", "Highest margin estimate"),
+)
+
 class EstimatesCalculator:
     """Service for calculating estimates and classifications"""
     
     def __init__(self):
         pass
 
-    def _convert_to_crores(self, value: Optional[float], revenue_format: str) -> Optional[float]:
-        """
-        Convert a value to crores based on the revenue format
-        
-        Args:
-            value: The value to convert
-            revenue_format: The format of the value ("Lakhs", "Crores", or "Millions")
-            
-        Returns:
-            Value converted to crores
-        """
-        if value is None:
-            return None
-            
-        if revenue_format == "Lakhs":
-            return value / 100  # 1 crore = 100 lakhs
-        elif revenue_format == "Millions":
-            return value / 10  # 1 crore = 10 million (approximately)
-        else:  # Already in crores
-            return value
-
-    def _validate_required_fields(self, data: Dict, path: str, required_fields: Dict[str, str]) -> None:
+    def _validate_required_fields(self, data: Dict, path: str, required_fields: Tuple[Tuple[str, str], ...]) -> None:
         """
         Validate that all required fields exist and are not null
         
         Args:
             data: Dictionary to validate
             path: Path to the data for error messages
-            required_fields: Dictionary of field names and their descriptions
+            required_fields: Pairs of field names and their descriptions
             
         Raises:
             ValueError: If any required field is missing or null
         """
-        for field, description in required_fields.items():
-            if field not in data or data[field] is None:
+        for field, description in required_fields:
+            if data.get(field) is None:
                 raise ValueError(f"{description} in {path} is missing or null")
 
     def prepare_input_data(self, financial_data: Dict, stock_data: Dict) -> Dict:
@@ -70,20 +75,16 @@ class EstimatesCalculator:
             current_quarter = financial_data["currentQuarter"]
             revenue_format = financial_data.get("revenue-format", "Crores")
             
-            # Convert only the specific fields needed for operating income calculation
-            fields_to_convert = ["revenueFromOps", "totalExpenses", "depreciation", "financeCosts"]
-            converted_quarter = current_quarter.copy()
-            for field in fields_to_convert:
-                if field in current_quarter:
-                    converted_quarter[field] = self._convert_to_crores(current_quarter[field], revenue_format)
+            # Convert only the fields the operating income calculation reads, without copying the rest;
+            # values already in crores are kept as they are
+            divisor = CRORE_DIVISORS.get(revenue_format)
+            converted_quarter = {}
+            for field in _OPERATING_INCOME_FIELDS:
+                value = current_quarter.get(field)
+                converted_quarter[field] = value / divisor if divisor is not None and value is not None else value
             
             # Validate required financial fields
-            self._validate_required_fields(converted_quarter, "currentQuarter", {
-                "revenueFromOps": "Revenue from operations",
-                "totalExpenses": "Total expenses",
-                "depreciation": "Depreciation",
-                "financeCosts": "Finance costs"
-            })
+            self._validate_required_fields(converted_quarter, "currentQuarter", _REQUIRED_QUARTER_FIELDS)
             
             # Validate stock data
             if "estimates" not in stock_data:
@@ -94,25 +95,17 @@ class EstimatesCalculator:
             # Validate baseline sales data
             if "baselineSalesData" not in estimates:
                 raise ValueError("Baseline sales data is missing")
-            self._validate_required_fields(estimates["baselineSalesData"], "baselineSalesData", {
-                "previousSalesNumber": "Previous sales number"
-            })
+            self._validate_required_fields(estimates["baselineSalesData"], "baselineSalesData", _REQUIRED_BASELINE_FIELDS)
             
             # Validate sales growth estimates
             if "salesGrowthEstimates" not in estimates:
                 raise ValueError("Sales growth estimates are missing")
-            self._validate_required_fields(estimates["salesGrowthEstimates"], "salesGrowthEstimates", {
-                "lowestSalesGrowthPercent": "Lowest sales growth estimate",
-                "highestSalesGrowthPercent": "Highest sales growth estimate"
-            })
+            self._validate_required_fields(estimates["salesGrowthEstimates"], "salesGrowthEstimates", _REQUIRED_SALES_GROWTH_FIELDS)
             
             # Validate margin estimates
             if "marginEstimatesValue" not in estimates:
                 raise ValueError("Margin estimates are missing")
-            self._validate_required_fields(estimates["marginEstimatesValue"], "marginEstimatesValue", {
-                "lowestMarginEstimate": "Lowest margin estimate",
-                "highestMarginEstimate": "Highest margin estimate"
-            })
+            self._validate_required_fields(estimates["marginEstimatesValue"], "marginEstimatesValue", _REQUIRED_MARGIN_FIELDS)
             
             # Calculate actual margin using shared calculation with converted values
             actual_profit, actual_margin = FinancialCalculations.calculate_operating_income(converted_quarter)
@@ -144,35 +137,37 @@ class EstimatesCalculator:
             logger.error(f"Error preparing input data: {str(e)}")
             raise
 
-    def _calculate_boundaries(self, lowest: float, highest: float) -> Dict[str, float]:
-        """Calculate classification boundaries based on lowest and highest estimates"""
+    def _classify_metric(self, value: float, lowest: float, highest: float) -> Dict:
+        """
+        Calculate classification boundaries from the lowest and highest estimates and classify a value against them
+
+        Args:
+            value: The actual value
+            lowest: Lowest estimate
+            highest: Highest estimate
+
+        Returns:
+            Dictionary with the classification, the position of the value in the estimate range (percent) and the boundaries
+        """
         span = highest - lowest
-        return {
+        boundaries = {
             "below_avg": lowest,
             "avg_good": lowest + (span * 0.50),
             "good_vgood": lowest + (span * 0.80),
             "vgood_blockbuster": lowest + (span * 0.90)
         }
 
-    def _classify_value(self, value: float, boundaries: Dict[str, float], highest_estimate: float) -> Dict:
-        """Classify a value based on boundaries and highest estimate"""
-        range_span = highest_estimate - boundaries["below_avg"]
-        position_in_range = ((value - boundaries["below_avg"]) / range_span) * 100
-        
-        if value < boundaries["below_avg"]:
-            classification = "Below Avg"
-        elif value >= boundaries["below_avg"] and value < boundaries["avg_good"]:
-            classification = "Avg"
-        elif value >= boundaries["avg_good"] and value < boundaries["good_vgood"]:
-            classification = "Good"
-        elif value >= boundaries["good_vgood"] and value < boundaries["vgood_blockbuster"]:
-            classification = "Very Good"
+        if span >= 0:
+            # Each band includes its lower boundary
+            classification = _CLASSIFICATIONS[bisect.bisect_right(tuple(boundaries.values()), value)]
         else:
-            classification = "Blockbuster"
-            
+            # Inverted range, possible for profit when margins are negative: the bands are empty
+            classification = "Below Avg" if value < lowest else "Blockbuster"
+
         return {
             "classification": classification,
-            "positionInRange": position_in_range
+            "positionInRange": ((value - lowest) / span) * 100,
+            "boundaries": boundaries
         }
 
     def _validate_inputs(self, inputs: Dict) -> Dict:
@@ -224,13 +219,9 @@ class EstimatesCalculator:
             # Calculate actual growth percentage
             actual_growth = ((inputs["actualSales"] - inputs["previousSales"]) / inputs["previousSales"]) * 100
 
-            # Calculate sales boundaries and classification
-            sales_boundaries = self._calculate_boundaries(inputs["lowestEstimate"], inputs["highestEstimate"])
-            sales_classification = self._classify_value(actual_growth, sales_boundaries, inputs["highestEstimate"])
-
-            # Calculate margin boundaries and classification
-            margin_boundaries = self._calculate_boundaries(inputs["lowestMarginEstimate"], inputs["highestMarginEstimate"])
-            margin_classification = self._classify_value(inputs["actualMargin"], margin_boundaries, inputs["highestMarginEstimate"])
+            # Classify sales growth and margin against their estimate ranges
+            sales = self._classify_metric(actual_growth, inputs["lowestEstimate"], inputs["highestEstimate"])
+            margin = self._classify_metric(inputs["actualMargin"], inputs["lowestMarginEstimate"], inputs["highestMarginEstimate"])
 
             # Calculate profit estimates
             lowest_estimated_sales = inputs["previousSales"] * (1 + (inputs["lowestEstimate"] / 100))
@@ -238,30 +229,14 @@ class EstimatesCalculator:
             lowest_estimated_profit = lowest_estimated_sales * (inputs["lowestMarginEstimate"] / 100)
             highest_estimated_profit = highest_estimated_sales * (inputs["highestMarginEstimate"] / 100)
 
-            # Calculate profit boundaries and classification
-            profit_boundaries = self._calculate_boundaries(lowest_estimated_profit, highest_estimated_profit)
-            profit_classification = self._classify_value(inputs["actualProfit"], profit_boundaries, highest_estimated_profit)
+            # Classify profit against the estimated profit range
+            profit = self._classify_metric(inputs["actualProfit"], lowest_estimated_profit, highest_estimated_profit)
 
             return {
                 "stockData": inputs["stockData"],
-                "sales": {
-                    "actualGrowthPercentage": actual_growth,
-                    "classification": sales_classification["classification"],
-                    "positionInRange": sales_classification["positionInRange"],
-                    "boundaries": sales_boundaries
-                },
-                "margin": {
-                    "actualMarginValue": inputs["actualMargin"],
-                    "classification": margin_classification["classification"],
-                    "positionInRange": margin_classification["positionInRange"],
-                    "boundaries": margin_boundaries
-                },
-                "profit": {
-                    "actualProfitValue": inputs["actualProfit"],
-                    "classification": profit_classification["classification"],
-                    "positionInRange": profit_classification["positionInRange"],
-                    "boundaries": profit_boundaries
-                }
+                "sales": {"actualGrowthPercentage": actual_growth, **sales},
+                "margin": {"actualMarginValue": inputs["actualMargin"], **margin},
+                "profit": {"actualProfitValue": inputs["actualProfit"], **profit}
             }
 
         except Exception as e:
@@ -1,45 +1,78 @@
 from typing import Dict, Optional
+import functools
 import logging
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
+# IST is a fixed +05:30 offset with no DST, so no zone database lookup is needed
+_IST = timezone(timedelta(hours=5, minutes=30))
+
+# Map classifications to emojis
+_EMOJI_MAP = {
+    "Below Avg": "🔴",
+    "Avg": "🟠",
+    "Good": "🟡",
+    "Very Good": "🟢",
+    "Blockbuster": "🔥"
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_number_cached(num: Optional[float], format_type: str) -> str:
+    """Format a number with commas and appropriate units; repeated values across reports hit the cache"""
+    if num is None:
+        return "N/A"
+    
+    if format_type == "percentage":
+        return f"{num:.2f}%"
+    elif format_type == "currency":
+        return f"₹{num:,.2f} Cr"
+    else:
+        return f"{num:,.2f}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_classification_label(classification_level: str, position: float) -> str:
+    """Format a classification level and its position in the estimate range (percent)"""
+    emoji = _EMOJI_MAP.get(classification_level, "")
+    # Ensure the emoji is outside of any HTML tags and properly escape special characters
+    return f"{emoji} <b>{classification_level}</b> ({position:.1f}%)"
+
 
 class EstimatesReportBuilder:
     """Service for formatting estimates data into readable messages"""
-    
-    def __init__(self):
-        pass
+
+    # Stateless: instances carry no attribute dict
+    __slots__ = ()
 
     def _format_number(self, num: Optional[float], format_type: str = "default") -> str:
         """Helper function to format numbers with commas and appropriate units"""
-        if num is None:
-            return "N/A"
-        
-        if format_type == "percentage":
-            return f"{num:.2f}%"
-        elif format_type == "currency":
-            return f"₹{num:,.2f} Cr"
-        else:
-            return f"{num:,.2f}"
+        return _format_number_cached(num, format_type)
 
     def _format_classification(self, classification: Dict) -> str:
         """Helper function to format classification data with emoji indicators"""
-        classification_level = classification['classification']
-        position = classification['positionInRange']
-        
-        # Map classifications to emojis
-        emoji_map = {
-            "Below Avg": "🔴",
-            "Avg": "🟠",
-            "Good": "🟡",
-            "Very Good": "🟢",
-            "Blockbuster": "🔥"
-        }
-        
-        emoji = emoji_map.get(classification_level, "")
-        # Ensure the emoji is outside of any HTML tags and properly escape special characters
-        return f"{emoji} <b>{classification_level}</b> ({position:.1f}%)"
+        # Positions are shown to one decimal, so rounding first keeps the cache small without changing the text
+        return _format_classification_label(classification['classification'], round(classification['positionInRange'], 1))
+
+    # Classification boundaries of one metric; each boundary closes one band and opens the next
+    _BOUNDARIES_TEMPLATE = (
+        "{label}:\n"
+        "Below Average: &lt; {below_avg}\n"
+        "Average: {below_avg} - {avg_good}\n"
+        "Good: {avg_good} - {good_vgood}\n"
+        "Very Good: {good_vgood} - {vgood_blockbuster}\n"
+        "Blockbuster: &gt; {vgood_blockbuster}"
+    )
+
+    def _format_boundaries(self, label: str, boundaries: Dict[str, float], format_type: str) -> str:
+        """Helper function to format the classification boundaries of one metric, formatting each boundary once"""
+        return self._BOUNDARIES_TEMPLATE.format(
+            label=label,
+            below_avg=self._format_number(boundaries['below_avg'], format_type),
+            avg_good=self._format_number(boundaries['avg_good'], format_type),
+            good_vgood=self._format_number(boundaries['good_vgood'], format_type),
+            vgood_blockbuster=self._format_number(boundaries['vgood_blockbuster'], format_type)
+        )
 
     def format_estimates_data(self, estimates_data: Dict) -> str:
         """
@@ -94,56 +127,42 @@ class EstimatesReportBuilder:
         try:
             # Create the formatted output
             stock_name = estimates_data.get('stockData', {}).get('stockName', 'Test Company')
-            output_lines = [
+
+            # Bind the formatting helpers once
+            format_number = self._format_number
+            format_classification = self._format_classification
+            format_boundaries = self._format_boundaries
+
+            # Current time in IST
+            formatted_time = datetime.now(_IST).strftime("%I:%M:%S %p · %d %b %y")
+
+            # Every line is known up front, so the report is joined from a single tuple
+            return "\n".join((
                 f"<b>{stock_name}</b>",
                 "",
                 "📊 ESTIMATES ANALYSIS",
                 "",
                 "📈 Sales Growth",
-                f"Actual Growth: {self._format_number(estimates_data['sales']['actualGrowthPercentage'], 'percentage')}",
-                f"Classification: {self._format_classification(estimates_data['sales'])}",
+                f"Actual Growth: {format_number(estimates_data['sales']['actualGrowthPercentage'], 'percentage')}",
+                f"Classification: {format_classification(estimates_data['sales'])}",
                 "",
                 "💰 Margin Performance",
-                f"Actual Margin: {self._format_number(estimates_data['margin']['actualMarginValue'], 'percentage')}",
-                f"Classification: {self._format_classification(estimates_data['margin'])}",
+                f"Actual Margin: {format_number(estimates_data['margin']['actualMarginValue'], 'percentage')}",
+                f"Classification: {format_classification(estimates_data['margin'])}",
                 "",
                 "💵 Profit Analysis",
-                f"Actual Profit: {self._format_number(estimates_data['profit']['actualProfitValue'], 'currency')}",
-                f"Classification: {self._format_classification(estimates_data['profit'])}",
+                f"Actual Profit: {format_number(estimates_data['profit']['actualProfitValue'], 'currency')}",
+                f"Classification: {format_classification(estimates_data['profit'])}",
                 "",
                 "📊 Classification Boundaries",
-                "Sales Growth:",
-                f"Below Average: &lt; {self._format_number(estimates_data['sales']['boundaries']['below_avg'], 'percentage')}",
-                f"Average: {self._format_number(estimates_data['sales']['boundaries']['below_avg'], 'percentage')} - {self._format_number(estimates_data['sales']['boundaries']['avg_good'], 'percentage')}",
-                f"Good: {self._format_number(estimates_data['sales']['boundaries']['avg_good'], 'percentage')} - {self._format_number(estimates_data['sales']['boundaries']['good_vgood'], 'percentage')}",
-                f"Very Good: {self._format_number(estimates_data['sales']['boundaries']['good_vgood'], 'percentage')} - {self._format_number(estimates_data['sales']['boundaries']['vgood_blockbuster'], 'percentage')}",
-                f"Blockbuster: &gt; {self._format_number(estimates_data['sales']['boundaries']['vgood_blockbuster'], 'percentage')}",
+                format_boundaries("Sales Growth", estimates_data['sales']['boundaries'], 'percentage'),
                 "",
-                "Margin:",
-                f"Below Average: &lt; {self._format_number(estimates_data['margin']['boundaries']['below_avg'], 'percentage')}",
-                f"Average: {self._format_number(estimates_data['margin']['boundaries']['below_avg'], 'percentage')} - {self._format_number(estimates_data['margin']['boundaries']['avg_good'], 'percentage')}",
-                f"Good: {self._format_number(estimates_data['margin']['boundaries']['avg_good'], 'percentage')} - {self._format_number(estimates_data['margin']['boundaries']['good_vgood'], 'percentage')}",
-                f"Very Good: {self._format_number(estimates_data['margin']['boundaries']['good_vgood'], 'percentage')} - {self._format_number(estimates_data['margin']['boundaries']['vgood_blockbuster'], 'percentage')}",
-                f"Blockbuster: &gt; {self._format_number(estimates_data['margin']['boundaries']['vgood_blockbuster'], 'percentage')}",
+                format_boundaries("Margin", estimates_data['margin']['boundaries'], 'percentage'),
                 "",
-                "Profit:",
-                f"Below Average: &lt; {self._format_number(estimates_data['profit']['boundaries']['below_avg'], 'currency')}",
-                f"Average: {self._format_number(estimates_data['profit']['boundaries']['below_avg'], 'currency')} - {self._format_number(estimates_data['profit']['boundaries']['avg_good'], 'currency')}",
-                f"Good: {self._format_number(estimates_data['profit']['boundaries']['avg_good'], 'currency')} - {self._format_number(estimates_data['profit']['boundaries']['good_vgood'], 'currency')}",
-                f"Very Good: {self._format_number(estimates_data['profit']['boundaries']['good_vgood'], 'currency')} - {self._format_number(estimates_data['profit']['boundaries']['vgood_blockbuster'], 'currency')}",
-                f"Blockbuster: &gt; {self._format_number(estimates_data['profit']['boundaries']['vgood_blockbuster'], 'currency')}"
-            ]
-
-            # Add current time in IST
-            utc_now = datetime.now(pytz.utc)
-            ist_tz = pytz.timezone("Asia/Kolkata")
-            ist_time = utc_now.astimezone(ist_tz)
-            formatted_time = ist_time.strftime("%I:%M:%S %p · %d %b %y")
-            
-            output_lines.append(f"\n<code>{formatted_time}</code>")
-            
-            return "\n".join(output_lines)
+                format_boundaries("Profit", estimates_data['profit']['boundaries'], 'currency'),
+                f"\n<code>{formatted_time}</code>"
+            ))
             
         except Exception as e:
-            logger.error(f"Error formatting estimates data: {str(e)}")
+            logger.error("Error formatting estimates data: %s", e)
             raise 
\ No newline at end of file
@@ -1,13 +1,31 @@
 import logging
+from string import Template
 from typing import List, Optional
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta, timezone
+from services.analysis import AnalyzedPage
 
 logger = logging.getLogger(__name__)
 
+# Report header, parsed once at import
+_REPORT_TEMPLATE = Template(
+    "✅ EXTRACTION COMPLETE\n"
+    "---------------------------------------------------\n"
+    "\n"
+    "📄 $filename\n"
+    "\n"
+    "📍 Page $result_pages of $total_pages\n"
+    "\n"
+    "🔍 $method"
+)
+# IST is a fixed +05:30 offset with no DST, so no zone database lookup is needed
+_IST = timezone(timedelta(hours=5, minutes=30))
+
 class ExtractionStatusFormatter:
+    # Stateless: instances carry no attribute dict
+    __slots__ = ()
+
     @staticmethod
-    def format_extraction_report(filename: str, pages: List[dict], result_pages: List[int], s3_url: Optional[str] = None, processing_time: Optional[float] = None) -> str:
+    def format_extraction_report(filename: str, pages: List[AnalyzedPage], result_pages: List[int], s3_url: Optional[str] = None, processing_time: Optional[float] = None, is_ocr: Optional[bool] = None) -> str:
         """
         Format the extraction report message for Telegram
         
@@ -17,27 +35,29 @@ class ExtractionStatusFormatter:
             result_pages: List of page numbers that were extracted
             s3_url: Optional S3 URL for the uploaded file
             processing_time: Optional processing time in seconds
+            is_ocr: Whether the pages came from OCR, if the caller knows; otherwise read from the pages
             
         Returns:
             str: Formatted message string
         """
+        # Get total pages and result pages; set before the try block, as the fallback message uses them
+        total_pages = len(pages)
+        # A single result page is the common case
+        result_page_str = str(result_pages[0]) if len(result_pages) == 1 else ", ".join(map(str, result_pages))
+
         try:
-            # Get total pages and result pages
-            total_pages = len(pages)
-            result_page_str = ", ".join(map(str, result_pages))
-            
             # Determine method used
-            method = "OCR" if any(page.get('isOcr', False) for page in pages) else "PyMuPDF"
+            if is_ocr is None:
+                is_ocr = any(page.isOcr for page in pages)
+            method = "OCR" if is_ocr else "PyMuPDF"
             
             message = [
-                "✅ EXTRACTION COMPLETE",
-                "---------------------------------------------------",
-                "",
-                f"📄 {filename}",
-                "",
-                f"📍 Page {result_page_str} of {total_pages}",
-                "",
-                f"🔍 {method}"
+                _REPORT_TEMPLATE.substitute(
+                    filename=filename,
+                    result_pages=result_page_str,
+                    total_pages=total_pages,
+                    method=method
+                )
             ]
             
             # Add processing time if available
@@ -49,9 +69,7 @@ class ExtractionStatusFormatter:
                 message.append(f"\n📄 Details: <a href='{s3_url}'>View Result</a>")
             
             # Add current time in IST
-            utc_now = datetime.now(pytz.utc)
-            ist_tz = pytz.timezone("Asia/Kolkata")
-            ist_time = utc_now.astimezone(ist_tz)
+            ist_time = datetime.now(_IST)
             formatted_time = ist_time.strftime("%I:%M:%S %p · %d %b %y")
 
             message.append(f"\n<code>{formatted_time}</code>")
@@ -59,5 +77,5 @@ class ExtractionStatusFormatter:
             return "\n".join(message)
             
         except Exception as e:
-            logger.error(f"Error formatting extraction report: {str(e)}")
+            logger.error("Error formatting extraction report: %s", e)
             return f"📄 {filename}\n📍 Page {result_page_str} of {total_pages}" 
\ No newline at end of file
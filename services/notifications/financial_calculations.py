@@ -3,6 +3,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Divisor converting a value in each revenue format to crores (1 crore = 100 lakhs = 10 million)
+CRORE_DIVISORS = {"Lakhs": 100, "Millions": 10}
+
+# Growth of a metric missing either value, or with no previous value to compare against
+_NA = ("N/A", "")
+
 class FinancialCalculations:
     """Utility class for shared financial calculations"""
     
@@ -44,13 +50,13 @@ class FinancialCalculations:
         Returns:
             Tuple of (growth_percentage, growth_arrow)
         """
-        if not previous or previous == 0:
-            return "N/A", ""
+        if not previous or current is None:
+            return _NA
             
-        # Use absolute value of previous to determine correct growth direction
-        growth = ((current - previous) / abs(previous) * 100)
-        arrow = "↑" if current > previous else "↓" if current < previous else ""
-        return f"{abs(growth):.2f}", arrow
+        # The direction comes from the change itself, so the sign of previous doesn't matter
+        change = current - previous
+        arrow = "↑" if change > 0 else "↓" if change < 0 else ""
+        return f"{abs(change / previous) * 100:.2f}", arrow
 
     @staticmethod
     def calculate_tax_percentage(pbt: Optional[float], pat: Optional[float]) -> Optional[float]:
@@ -68,6 +74,15 @@ class FinancialCalculations:
             return None
         return ((pbt - pat) / abs(pbt)) * 100
 
+    @staticmethod
+    def _signed_exceptional_items(pbt: Optional[float], pbt_before_exceptional: Optional[float], exceptional_items: Optional[float]) -> Optional[float]:
+        """Sign exceptional items by comparing PBT with PBT before exceptional items; None if any is missing"""
+        if pbt is None or pbt_before_exceptional is None or exceptional_items is None:
+            return None
+        
+        # Positive when exceptional items raised PBT, negative otherwise
+        return abs(exceptional_items) if pbt > pbt_before_exceptional else -abs(exceptional_items)
+
     @staticmethod
     def calculate_exceptional_items(current: Dict) -> Optional[float]:
         """
@@ -79,19 +94,11 @@ class FinancialCalculations:
         Returns:
             Exceptional items value with proper sign or None if data is missing
         """
-        if (current.get("profitLossBeforeTax") is None or 
-            current.get("profitLossBeforeExceptionalItemsAndTax") is None or
-            current.get("exceptionalItems") is None):
-            return None
-            
-        # Get absolute value of exceptional items
-        abs_exceptional_items = abs(current["exceptionalItems"])
-        
-        # Determine sign based on PBT comparison
-        if current["profitLossBeforeTax"] > current["profitLossBeforeExceptionalItemsAndTax"]:
-            return abs_exceptional_items  # Positive sign
-        else:
-            return -abs_exceptional_items  # Negative sign
+        return FinancialCalculations._signed_exceptional_items(
+            current.get("profitLossBeforeTax"),
+            current.get("profitLossBeforeExceptionalItemsAndTax"),
+            current.get("exceptionalItems")
+        )
 
     @staticmethod
     def calculate_total_other_income(quarter_data: Dict) -> float:
@@ -104,10 +111,7 @@ class FinancialCalculations:
         Returns:
             Total other income value
         """
-        total = sum(
-            (quarter_data.get(key) or 0)
-            for key in ["otherIncome", "extraOrdinaryItems"]
-        )
+        total = (quarter_data.get("otherIncome") or 0) + (quarter_data.get("extraOrdinaryItems") or 0)
         
         # Add shareOfPLOfAssociates only if it's positive
         share_of_pl = quarter_data.get("shareOfPLOfAssociates")
@@ -115,7 +119,11 @@ class FinancialCalculations:
             total += share_of_pl
             
         # Add exceptional items with proper sign
-        exceptional_items = FinancialCalculations.calculate_exceptional_items(quarter_data)
+        exceptional_items = FinancialCalculations._signed_exceptional_items(
+            quarter_data.get("profitLossBeforeTax"),
+            quarter_data.get("profitLossBeforeExceptionalItemsAndTax"),
+            quarter_data.get("exceptionalItems")
+        )
         if exceptional_items is not None:
             total += exceptional_items
             
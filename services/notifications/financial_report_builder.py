@@ -1,33 +1,76 @@
 from typing import Dict, List, Union, Optional
+import functools
 import logging
 import time
-from datetime import datetime
-import pytz
-from .financial_calculations import FinancialCalculations
+from datetime import datetime, timedelta, timezone
+from .financial_calculations import CRORE_DIVISORS, FinancialCalculations
 
 logger = logging.getLogger(__name__)
+# IST is a fixed +05:30 offset with no DST, so no zone database lookup is needed
+_IST = timezone(timedelta(hours=5, minutes=30))
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_number_cached(num: Optional[float], divisor: float) -> str:
+    """Format a number in crores with commas; repeated values across reports hit the cache"""
+    if num is None:
+        return "N/A"
+    return f"{num / divisor:,.2f}"
+
+
+# Metrics whose year-over-year growth is shown in the report
+_GROWTH_METRICS = (
+    "revenueFromOps", "depreciation", "financeCosts", "otherIncome",
+    "profitLossBeforeExceptionalItemsAndTax", "profitLossBeforeTax",
+    "profitLossAfterTaxFromOrdinaryActivities", "profitLossForThePeriod"
+)
+
+# Layout of the financial report; optional sections are filled in as prerendered blocks
+_REPORT_TEMPLATE = (
+    "<b>{stock_name}</b>\n"
+    "\n"
+    "📊 Q4 FY25 RESULTS\n"
+    "\n"
+    "💰 Revenue & Income\n"
+    "{revenue_line}\n"
+    "{other_income_block}\n"
+    "\n"
+    "📉 Expenses\n"
+    "{finance_costs_line}\n"
+    "{depreciation_line}\n"
+    "\n"
+    "📈 Operating Performance\n"
+    "{operating_income_line}\n"
+    "{opm_line}\n"
+    "\n"
+    "📊 Profitability\n"
+    "{pbt_line}\n"
+    "{pat_block}\n"
+    "\n"
+    "{tax_line}\n"
+    "\n"
+    "⏱️ Processing Time: {processing_time}s\n"
+    "\n"
+    "<code>{timestamp}</code>"
+)
 
 class FinancialReportBuilder:
     """Service for aggregating and formatting financial data messages"""
-    
-    def __init__(self):
-        pass
-
-    def _format_number(self, num: Optional[float], revenue_format: str) -> str:
-        """Helper function to format numbers with commas and convert to crores"""
-        if num is None:
-            return "N/A"
-        
-        # Convert to crores based on the Revenue-Format
-        value_in_crores = num
-        if revenue_format == "Lakhs":
-            value_in_crores = num / 100  # 1 crore = 100 lakhs
-        elif revenue_format == "Millions":
-            value_in_crores = num / 10  # 1 crore = 10 million (approximately)
-        
-        return f"{value_in_crores:,.2f}"
 
-    def _format_extraordinary_items(self, current: Dict, previous: Dict, revenue_format: str) -> str:
+    # Stateless: instances carry no attribute dict
+    __slots__ = ()
+
+    def _format_number(self, num: Optional[float], divisor: float) -> str:
+        """
+        Helper function to format numbers with commas and convert to crores
+
+        Args:
+            num: The value in the report's revenue format
+            divisor: Divisor converting that format to crores, from CRORE_DIVISORS
+        """
+        return _format_number_cached(num, divisor)
+
+    def _format_extraordinary_items(self, current: Dict, previous: Dict, divisor: float) -> str:
         """Helper function to format extraordinary items with YOY comparison"""
         extra_items_current = current.get('extraOrdinaryItems')
         if extra_items_current is None:
@@ -35,10 +78,10 @@ class FinancialReportBuilder:
             
         extra_items_prev = previous.get('extraOrdinaryItems')
         if extra_items_prev is not None:
-            return f"Extraordinary Items: {self._format_number(extra_items_current, revenue_format)} Cr (vs {self._format_number(extra_items_prev, revenue_format)} Cr YOY)"
-        return f"Extraordinary Items: {self._format_number(extra_items_current, revenue_format)} Cr"
+            return f"Extraordinary Items: {self._format_number(extra_items_current, divisor)} Cr (vs {self._format_number(extra_items_prev, divisor)} Cr YOY)"
+        return f"Extraordinary Items: {self._format_number(extra_items_current, divisor)} Cr"
 
-    def _format_metric_line(self, label: str, value: Optional[float], growth_data: tuple, revenue_format: str) -> str:
+    def _format_metric_line(self, label: str, value: Optional[float], growth_data: tuple, divisor: float) -> str:
         """
         Format a metric line with value and growth
         
@@ -46,12 +89,12 @@ class FinancialReportBuilder:
             label: The metric label
             value: The metric value
             growth_data: Tuple of (growth_percentage, growth_arrow)
-            revenue_format: The revenue format to use for number formatting
+            divisor: Divisor converting the report's revenue format to crores
             
         Returns:
             Formatted metric line
         """
-        return f"{label}: {self._format_number(value, revenue_format)} Cr ({growth_data[1]} {growth_data[0]}%)"
+        return f"{label}: {self._format_number(value, divisor)} Cr ({growth_data[1]} {growth_data[0]}%)"
 
     def format_financial_data(self, financial_data: Dict) -> str:
         """
@@ -86,165 +129,136 @@ class FinancialReportBuilder:
             Formatted string containing the financial data
         """
         try:
+            # Bind the quarters and helpers used throughout the report once
+            current = financial_data["currentQuarter"]
+            previous = financial_data["previousYearQuarter"]
+            # Convert to crores based on the Revenue-Format
+            divisor = CRORE_DIVISORS.get(financial_data["revenue-format"], 1)
+            stock_data = financial_data.get('stockData', {})
+            format_number = self._format_number
+            metric_line = self._format_metric_line
+
             # Calculate growth rates only for metrics that will be displayed
-            metrics_to_calculate = [
-                "revenueFromOps", "depreciation", "financeCosts", "otherIncome",
-                "profitLossBeforeExceptionalItemsAndTax", "profitLossBeforeTax",
-                "profitLossAfterTaxFromOrdinaryActivities", "profitLossForThePeriod"
-            ]
-            
+            calculate_growth = FinancialCalculations.calculate_growth
             growth_data = {
-                metric: FinancialCalculations.calculate_growth(
-                    financial_data["currentQuarter"][metric],
-                    financial_data["previousYearQuarter"][metric]
-                )
-                for metric in metrics_to_calculate
+                metric: calculate_growth(current[metric], previous[metric])
+                for metric in _GROWTH_METRICS
             }
             
             # Calculate adjusted PBT (including extraordinary items)
-            current_adjusted_pbt = FinancialCalculations.calculate_adjusted_pbt(financial_data["currentQuarter"])
-            previous_adjusted_pbt = FinancialCalculations.calculate_adjusted_pbt(financial_data["previousYearQuarter"])
+            current_adjusted_pbt = FinancialCalculations.calculate_adjusted_pbt(current)
+            previous_adjusted_pbt = FinancialCalculations.calculate_adjusted_pbt(previous)
             
             adjusted_pbt_growth = FinancialCalculations.calculate_growth(current_adjusted_pbt, previous_adjusted_pbt)
             
             # Calculate Operating Income and Operating Income %
-            current_operating_income, current_operating_income_percent = FinancialCalculations.calculate_operating_income(financial_data["currentQuarter"])
-            prev_operating_income, prev_operating_income_percent = FinancialCalculations.calculate_operating_income(financial_data["previousYearQuarter"])
+            current_operating_income, current_operating_income_percent = FinancialCalculations.calculate_operating_income(current)
+            prev_operating_income, prev_operating_income_percent = FinancialCalculations.calculate_operating_income(previous)
             
             operating_income_growth = FinancialCalculations.calculate_growth(current_operating_income, prev_operating_income)
             
             # Calculate tax percentage
             current_tax_percentage = FinancialCalculations.calculate_tax_percentage(
                 current_adjusted_pbt,
-                financial_data['currentQuarter']['profitLossForThePeriod']
+                current['profitLossForThePeriod']
             )
             prev_tax_percentage = FinancialCalculations.calculate_tax_percentage(
                 previous_adjusted_pbt,
-                financial_data['previousYearQuarter']['profitLossForThePeriod']
+                previous['profitLossForThePeriod']
             )
             
-            # Create the formatted output
-            stock_name = financial_data.get('stockData', {}).get('stockName', 'Test Company')
-            output_lines = [
-                f"<b>{stock_name}</b>",
-                "",
-                "📊 Q4 FY25 RESULTS",
-                "",
-                "💰 Revenue & Income",
-                f"Revenue: {self._format_number(financial_data['currentQuarter']['revenueFromOps'], financial_data['revenue-format'])} Cr ({growth_data['revenueFromOps'][1]} {growth_data['revenueFromOps'][0]}%)"
-            ]
-            
+            # Extraordinary items appear both under Other Income and under Profitability
+            has_extraordinary_items = current.get("extraOrdinaryItems") is not None
+            extra_items_line = self._format_extraordinary_items(current, previous, divisor) if has_extraordinary_items else ""
+
             # Handle Other Income based on whether it has subcategories
             has_other_income_subcategories = (
-                financial_data["currentQuarter"].get("exceptionalItems") is not None or
-                financial_data["currentQuarter"].get("shareOfPLOfAssociates") is not None or
-                financial_data["currentQuarter"].get("extraOrdinaryItems") is not None
+                current.get("exceptionalItems") is not None or
+                current.get("shareOfPLOfAssociates") is not None or
+                has_extraordinary_items
             )
             
             if has_other_income_subcategories:
-                output_lines.extend([
+                other_income_lines = [
                     "",
                     "💵 Other Income"
-                ])
+                ]
                 
-                if financial_data["currentQuarter"].get("otherIncome") is not None:
-                    output_lines.append(
-                        f"Other Income: {self._format_number(financial_data['currentQuarter']['otherIncome'], financial_data['revenue-format'])} Cr ({growth_data['otherIncome'][1]} {growth_data['otherIncome'][0]}%)"
+                if current.get("otherIncome") is not None:
+                    other_income_lines.append(
+                        metric_line("Other Income", current['otherIncome'], growth_data['otherIncome'], divisor)
                     )
                 
-                if financial_data["currentQuarter"].get("exceptionalItems") is not None:
-                    exceptional_items = FinancialCalculations.calculate_exceptional_items(financial_data["currentQuarter"])
-                    output_lines.append(
-                        f"Exceptional Items: {self._format_number(exceptional_items, financial_data['revenue-format'])} Cr"
+                if current.get("exceptionalItems") is not None:
+                    exceptional_items = FinancialCalculations.calculate_exceptional_items(current)
+                    other_income_lines.append(
+                        f"Exceptional Items: {format_number(exceptional_items, divisor)} Cr"
                     )
                 
-                if financial_data["currentQuarter"].get("shareOfPLOfAssociates") is not None:
-                    share_of_pl = financial_data["currentQuarter"]["shareOfPLOfAssociates"]
+                if current.get("shareOfPLOfAssociates") is not None:
+                    share_of_pl = current["shareOfPLOfAssociates"]
                     if share_of_pl > 0:
-                        output_lines.append(
-                            f"Share of P&L of Associates: {self._format_number(share_of_pl, financial_data['revenue-format'])} Cr"
+                        other_income_lines.append(
+                            f"Share of P&L of Associates: {format_number(share_of_pl, divisor)} Cr"
                         )
                 
-                if financial_data["currentQuarter"].get("extraOrdinaryItems") is not None:
-                    output_lines.append(self._format_extraordinary_items(
-                        financial_data["currentQuarter"],
-                        financial_data["previousYearQuarter"],
-                        financial_data['revenue-format']
-                    ))
+                if has_extraordinary_items:
+                    other_income_lines.append(extra_items_line)
                 
                 # Calculate total other income
-                total_other_income = FinancialCalculations.calculate_total_other_income(financial_data["currentQuarter"])
-                prev_total_other_income = FinancialCalculations.calculate_total_other_income(financial_data["previousYearQuarter"])
+                total_other_income = FinancialCalculations.calculate_total_other_income(current)
+                prev_total_other_income = FinancialCalculations.calculate_total_other_income(previous)
 
                 # Calculate growth for total other income
                 total_other_income_growth = FinancialCalculations.calculate_growth(total_other_income, prev_total_other_income)
                 
-                output_lines.append(f"💰 Total Other Income: {self._format_number(total_other_income, financial_data['revenue-format'])} Cr ({total_other_income_growth[1]} {total_other_income_growth[0]}%) 💰")
+                other_income_lines.append(f"💰 Total Other Income: {format_number(total_other_income, divisor)} Cr ({total_other_income_growth[1]} {total_other_income_growth[0]}%) 💰")
 
                 # Add Other section if there are negative Share of P&L of Associates
-                if financial_data["currentQuarter"].get("shareOfPLOfAssociates") is not None and financial_data["currentQuarter"]["shareOfPLOfAssociates"] < 0:
-                    output_lines.extend([
+                if current.get("shareOfPLOfAssociates") is not None and current["shareOfPLOfAssociates"] < 0:
+                    other_income_lines.extend([
                         "",
                         "📉 Other",
-                        f"Share of P&L of Associates: {self._format_number(financial_data['currentQuarter']['shareOfPLOfAssociates'], financial_data['revenue-format'])} Cr"
+                        f"Share of P&L of Associates: {format_number(current['shareOfPLOfAssociates'], divisor)} Cr"
                     ])
+                other_income_block = "\n".join(other_income_lines)
             else:
-                output_lines.append(
-                    f"Other Income: {self._format_number(financial_data['currentQuarter']['otherIncome'], financial_data['revenue-format'])} Cr ({growth_data['otherIncome'][1]} {growth_data['otherIncome'][0]}%)"
-                )
-            
-            output_lines.extend([
-                "",
-                "📉 Expenses",
-                self._format_metric_line("Fin Costs", financial_data['currentQuarter']['financeCosts'], growth_data['financeCosts'], financial_data['revenue-format']),
-                self._format_metric_line("Dep", financial_data['currentQuarter']['depreciation'], growth_data['depreciation'], financial_data['revenue-format']),
-                "",
-                "📈 Operating Performance",
-                self._format_metric_line("Operating Income", current_operating_income, operating_income_growth, financial_data['revenue-format']),
-                f"OPM %: {current_operating_income_percent:.2f}% (vs {prev_operating_income_percent:.2f}% YOY)" if current_operating_income_percent is not None and prev_operating_income_percent is not None else "Operating Income %: N/A",
-                "",
-                "📊 Profitability",
-                self._format_metric_line("PBT", current_adjusted_pbt, adjusted_pbt_growth, financial_data['revenue-format']),
-            ])
+                other_income_block = metric_line("Other Income", current['otherIncome'], growth_data['otherIncome'], divisor)
 
             # Check if Extraordinary Items are present
-            if financial_data['currentQuarter'].get('extraOrdinaryItems') is not None:
-                # For PAT from Ordinary Activities - this always has growth data
-                pat_ord_line = f"PAT from Ord. Act.: {self._format_number(financial_data['currentQuarter']['profitLossAfterTaxFromOrdinaryActivities'], financial_data['revenue-format'])} Cr ({growth_data['profitLossAfterTaxFromOrdinaryActivities'][1]} {growth_data['profitLossAfterTaxFromOrdinaryActivities'][0]}%)"
-                
-                # Use the helper method for extraordinary items
-                extra_items_line = self._format_extraordinary_items(
-                    financial_data["currentQuarter"],
-                    financial_data["previousYearQuarter"],
-                    financial_data['revenue-format']
-                )
-                
-                # For Final PAT - this always has growth data
-                final_pat_line = f"Final PAT: {self._format_number(financial_data['currentQuarter']['profitLossForThePeriod'], financial_data['revenue-format'])} Cr ({growth_data['profitLossForThePeriod'][1]} {growth_data['profitLossForThePeriod'][0]}%)"
-                
-                output_lines.extend([pat_ord_line, extra_items_line, final_pat_line])
+            if has_extraordinary_items:
+                # PAT from Ordinary Activities, Extraordinary Items and Final PAT - both PATs always have growth data
+                pat_block = "\n".join((
+                    metric_line("PAT from Ord. Act.", current['profitLossAfterTaxFromOrdinaryActivities'], growth_data['profitLossAfterTaxFromOrdinaryActivities'], divisor),
+                    extra_items_line,
+                    metric_line("Final PAT", current['profitLossForThePeriod'], growth_data['profitLossForThePeriod'], divisor)
+                ))
             else:
-                output_lines.append(
-                    f"PAT: {self._format_number(financial_data['currentQuarter']['profitLossForThePeriod'], financial_data['revenue-format'])} Cr ({growth_data['profitLossForThePeriod'][1]} {growth_data['profitLossForThePeriod'][0]}%)"
-                )
-
-            output_lines.extend([
-                "",
-                f"Tax %: {current_tax_percentage:.2f}% (vs {prev_tax_percentage:.2f}% YOY)" if current_tax_percentage is not None and prev_tax_percentage is not None else "Tax %: N/A",
-                "",
-                f"⏱️ Processing Time: {round((financial_data.get('stockData', {}).get('nodeElapsedMs', 0) / 1000) + (time.perf_counter() - financial_data.get('stockData', {}).get('pythonStart', time.perf_counter())), 2)}s"
-            ])
-
-            # Add current time in IST
-            utc_now = datetime.now(pytz.utc)
-            ist_tz = pytz.timezone("Asia/Kolkata")
-            ist_time = utc_now.astimezone(ist_tz)
-            formatted_time = ist_time.strftime("%I:%M:%S %p · %d %b %y")
-            
-            output_lines.append(f"\n<code>{formatted_time}</code>")
-            
-            return "\n".join(output_lines)
+                pat_block = metric_line("PAT", current['profitLossForThePeriod'], growth_data['profitLossForThePeriod'], divisor)
+
+            # Node.js time plus the Python time since pythonStart, if it was recorded
+            processing_time = stock_data.get('nodeElapsedMs', 0) / 1000
+            python_start = stock_data.get('pythonStart')
+            if python_start is not None:
+                processing_time += time.perf_counter() - python_start
+
+            # Fill the report template
+            return _REPORT_TEMPLATE.format_map({
+                "stock_name": stock_data.get('stockName', 'Test Company'),
+                "revenue_line": metric_line("Revenue", current['revenueFromOps'], growth_data['revenueFromOps'], divisor),
+                "other_income_block": other_income_block,
+                "finance_costs_line": metric_line("Fin Costs", current['financeCosts'], growth_data['financeCosts'], divisor),
+                "depreciation_line": metric_line("Dep", current['depreciation'], growth_data['depreciation'], divisor),
+                "operating_income_line": metric_line("Operating Income", current_operating_income, operating_income_growth, divisor),
+                "opm_line": f"OPM %: {current_operating_income_percent:.2f}% (vs {prev_operating_income_percent:.2f}% YOY)" if current_operating_income_percent is not None and prev_operating_income_percent is not None else "Operating Income %: N/A",
+                "pbt_line": metric_line("PBT", current_adjusted_pbt, adjusted_pbt_growth, divisor),
+                "pat_block": pat_block,
+                "tax_line": f"Tax %: {current_tax_percentage:.2f}% (vs {prev_tax_percentage:.2f}% YOY)" if current_tax_percentage is not None and prev_tax_percentage is not None else "Tax %: N/A",
+                "processing_time": round(processing_time, 2),
+                # Current time in IST
+                "timestamp": datetime.now(_IST).strftime("%I:%M:%S %p · %d %b %y")
+            })
             
         except Exception as e:
-            logger.error(f"Error formatting financial data: {str(e)}")
+            logger.error("Error formatting financial data: %s", e)
             raise 
\ No newline at end of file
@@ -0,0 +1,73 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class NotificationQueue:
+    """Delivers notification sends in FIFO order from a background worker, off the request path"""
+
+    def __init__(self, maxsize: int = 100):
+        """
+        Args:
+            maxsize: Maximum number of pending sends; further sends are dropped and logged
+        """
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background worker on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._worker = asyncio.create_task(self._drain())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Wait for pending sends to finish, then stop the worker
+
+        Args:
+            timeout: Seconds to wait for the queue to drain before giving up
+        """
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} pending notifications on shutdown")
+        self._worker.cancel()
+        self._worker = None
+
+    def put(self, send: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Queue a send call; it runs after earlier sends, coroutine functions on the
+        event loop and blocking functions in a worker thread
+
+        Args:
+            send: The send function, e.g. TelegramNotificationService.send_message
+            *args: Positional arguments for send
+            **kwargs: Keyword arguments for send
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((send, args, kwargs))
+        except asyncio.QueueFull:
+            logger.error(f"Notification queue full, dropping {getattr(send, '__name__', send)}")
+
+    async def _drain(self) -> None:
+        """Run queued sends one at a time; failures are logged and never surfaced"""
+        while True:
+            send, args, kwargs = await self._queue.get()
+            try:
+                if inspect.iscoroutinefunction(send):
+                    await send(*args, **kwargs)
+                else:
+                    await asyncio.to_thread(send, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error sending notification: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+# Shared queue so notifications from all components keep their order
+notification_queue = NotificationQueue()
@@ -1,13 +1,83 @@
+import asyncio
 import os
 import logging
 import httpx
 from pathlib import Path
 from typing import Optional, Dict
-import io
 from services.notifications.financial_report_builder import FinancialReportBuilder
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_API_URL = "https://api.telegram.org"
+# Attempts per Bot API call for rate limits (429); connection failures before the
+# request is sent are retried separately by the transport
+TELEGRAM_MAX_ATTEMPTS = 4
+# Longest wait honoured between attempts, in seconds
+TELEGRAM_MAX_RETRY_DELAY = 30.0
+
+# Process-wide client so every service instance shares one pooled HTTP/2
+# connection to the Bot API
+_shared_client: Optional[httpx.AsyncClient] = None
+
+def get_telegram_client() -> httpx.AsyncClient:
+    """Return the shared async client for the Bot API, creating it on first use"""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            base_url=TELEGRAM_API_URL,
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            # HTTP/2 and pool limits belong to the transport once one is given; its
+            # retries only cover failures to connect, so nothing is sent twice
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(max_keepalive_connections=16)
+            )
+        )
+    return _shared_client
+
+def _retry_after(response: httpx.Response) -> float:
+    """Seconds Telegram asks to wait after a 429, from parameters.retry_after or the Retry-After header"""
+    try:
+        retry_after = response.json().get("parameters", {}).get("retry_after")
+    except ValueError:
+        retry_after = None
+    if retry_after is None:
+        retry_after = response.headers.get("Retry-After", 1)
+    try:
+        return min(float(retry_after), TELEGRAM_MAX_RETRY_DELAY)
+    except ValueError:
+        return 1.0
+
+async def _post(path: str, **kwargs) -> httpx.Response:
+    """
+    POST to the Bot API, retrying rate limits. Sends are not idempotent and a 5xx may
+    come back after the message was delivered, so server errors are returned as is.
+
+    Args:
+        path: Method path relative to the API URL
+        **kwargs: Request arguments for httpx, e.g. data and files
+
+    Returns:
+        The last response, successful or not
+    """
+    client = get_telegram_client()
+    for attempt in range(TELEGRAM_MAX_ATTEMPTS):
+        response = await client.post(path, **kwargs)
+        if response.status_code != 429 or attempt == TELEGRAM_MAX_ATTEMPTS - 1:
+            return response
+        delay = _retry_after(response)
+        logger.warning(f"Telegram rate limit hit, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    return response
+
+async def close_telegram_client() -> None:
+    """Close the shared client's pooled connections, e.g. on application shutdown"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
 class TelegramNotificationService:
     def __init__(self, bot_token: str, chat_id: str):
         """
@@ -19,10 +89,13 @@ class TelegramNotificationService:
         """
         self.bot_token = bot_token
         self.chat_id = chat_id
-        self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.base_url = f"{TELEGRAM_API_URL}/bot{bot_token}"
+        # Bot API method paths, relative to the shared client's base URL
+        self._send_message_path = f"/bot{bot_token}/sendMessage"
+        self._send_document_path = f"/bot{bot_token}/sendDocument"
         self.financial_report_builder = FinancialReportBuilder()
 
-    def send_message(self, text: str, parse_mode: Optional[str] = None) -> bool:
+    async def send_message(self, text: str, parse_mode: Optional[str] = None) -> bool:
         """
         Send a text message to Telegram
         
@@ -44,10 +117,7 @@ class TelegramNotificationService:
                 data['parse_mode'] = parse_mode
 
             # Send the message
-            response = httpx.post(
-                f"{self.base_url}/sendMessage",
-                data=data
-            )
+            response = await _post(self._send_message_path, data=data)
 
             if response.status_code == 200:
                 logger.info("Successfully sent message to Telegram")
@@ -60,7 +130,7 @@ class TelegramNotificationService:
             logger.error(f"Error sending message to Telegram: {str(e)}")
             return False
 
-    def send_document(self, file_path: str, caption: Optional[str] = None) -> bool:
+    async def send_document(self, file_path: str, caption: Optional[str] = None) -> bool:
         """
         Send a document to Telegram
         
@@ -76,19 +146,18 @@ class TelegramNotificationService:
                 logger.error(f"File not found: {file_path}")
                 return False
 
-            # Prepare the file for sending
+            logger.debug(f"Sending {os.path.getsize(file_path)} byte document to Telegram: {file_path}")
+
+            # httpx streams the open file to the socket in chunks while encoding the
+            # multipart body, so the document is never held in memory as a whole
             with open(file_path, 'rb') as file:
-                files = {'document': file}
+                files = {'document': (os.path.basename(file_path), file)}
                 data = {'chat_id': self.chat_id}
                 if caption:
                     data['caption'] = caption
 
                 # Send the file
-                response = httpx.post(
-                    f"{self.base_url}/sendDocument",
-                    files=files,
-                    data=data
-                )
+                response = await _post(self._send_document_path, files=files, data=data)
 
                 if response.status_code == 200:
                     logger.info(f"Successfully sent document to Telegram: {file_path}")
@@ -101,7 +170,7 @@ class TelegramNotificationService:
             logger.error(f"Error sending document to Telegram: {str(e)}")
             return False
 
-    def send_document_bytes(self, pdf_bytes: bytes, filename: str, caption: Optional[str] = None) -> bool:
+    async def send_document_bytes(self, pdf_bytes: bytes, filename: str, caption: Optional[str] = None) -> bool:
         """
         Send a PDF document directly from bytes to Telegram
         
@@ -114,22 +183,15 @@ class TelegramNotificationService:
             bool: True if successful, False otherwise
         """
         try:
-            # Create a file-like object from bytes
-            file_obj = io.BytesIO(pdf_bytes)
-            file_obj.name = filename
-
-            # Prepare the file for sending
-            files = {'document': file_obj}
+            # Raw bytes go into the multipart body as a single chunk, without the
+            # BytesIO wrapper being read back in 64 KiB copies
+            files = {'document': (filename, pdf_bytes)}
             data = {'chat_id': self.chat_id}
             if caption:
                 data['caption'] = caption
 
             # Send the file
-            response = httpx.post(
-                f"{self.base_url}/sendDocument",
-                files=files,
-                data=data
-            )
+            response = await _post(self._send_document_path, files=files, data=data)
 
             if response.status_code == 200:
                 logger.info(f"Successfully sent document to Telegram: {filename}")
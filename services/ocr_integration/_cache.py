@@ -0,0 +1,60 @@
+import copy
+import functools
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _cache_key(content: bytes, provider: str) -> str:
+    """Hash the provider and the document bytes, so the same bytes sent to another provider miss"""
+    return f"{provider}:{hashlib.blake2b(content, digest_size=16).hexdigest()}"
+
+def cached_ocr(provider: str, maxsize: int = 64, ttl: float = 24 * 3600) -> Callable:
+    """
+    Decorate an OCR service's process_document with an in-memory LRU cache keyed
+    on a blake2b hash of the document bytes, so re-processing identical content
+    skips the remote OCR call.
+
+    The wrapped method accepts a disable_cache keyword to force a fresh OCR run,
+    whose result still replaces the cached one.
+
+    Args:
+        provider: Provider and model identifier included in the key, e.g. "azure:prebuilt-read"
+        maxsize: Maximum number of results kept; 0 disables the cache
+        ttl: Seconds a cached result stays valid
+
+    Returns:
+        Decorator for an async (self, content, ...) method
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        @functools.wraps(func)
+        async def wrapper(self, content: bytes, *args: Any, disable_cache: bool = False, **kwargs: Any) -> Any:
+            if maxsize <= 0:
+                return await func(self, content, *args, **kwargs)
+
+            key = _cache_key(content, provider)
+            if not disable_cache:
+                entry = cache.get(key)
+                if entry is not None:
+                    expires_at, result = entry
+                    if expires_at > time.monotonic():
+                        cache.move_to_end(key)
+                        logger.info(f"OCR result for {provider} served from cache")
+                        # Callers annotate the pages they get back, so hand out a copy
+                        return copy.deepcopy(result)
+                    del cache[key]
+
+            result = await func(self, content, *args, **kwargs)
+            cache[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+            cache.move_to_end(key)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return result
+
+        return wrapper
+    return decorator
@@ -1,20 +1,35 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+def ocr_page(page_number: int, text: str) -> Dict:
+    """Build the page dictionary OCR services return for one page, before term analysis"""
+    return {
+        "page_number": page_number,
+        "text": text,
+        "isRelevant": False,
+        "foundTerms": [],
+        "foundTermsCount": 0,
+        "uniqueTermsCount": 0,
+        "classification": "Not Relevant",
+        "isOcr": True
+    }
+
 class BaseOCR(ABC):
     """Abstract base class for OCR services"""
     
     @abstractmethod
-    async def process_document(self, content: bytes, filename: str) -> List[Dict]:
+    async def process_document(self, content: bytes, filename: str, page_count: Optional[int] = None) -> List[Dict]:
         """
         Process a document using OCR service
         
         Args:
             content: The document content in bytes
             filename: The name of the file
+            page_count: Number of pages, when the caller already parsed the document;
+                        services that need it then do not parse the content again
             
         Returns:
             List of dictionaries containing page information with the following structure:
@@ -29,4 +44,11 @@ class BaseOCR(ABC):
                 "isOcr": bool
             }
         """
+        pass
+
+    async def close(self) -> None:
+        """
+        Release the provider's network resources, e.g. on application shutdown.
+        The default does nothing; providers holding an async client override it.
+        """
         pass 
\ No newline at end of file
@@ -3,6 +3,9 @@ from typing import Dict, Type
 from .base_ocr import BaseOCR
 from .providers.azure_ocr import AzureOCR
 from .providers.textract_ocr import TextractOCR
+import logging
+
+logger = logging.getLogger(__name__)
 
 class OCRServiceType(Enum):
     AZURE_DOCUMENT_INTELLIGENCE = "azure_document_intelligence"
@@ -13,11 +16,13 @@ class OCRFactory:
         OCRServiceType.AZURE_DOCUMENT_INTELLIGENCE: AzureOCR,
         OCRServiceType.TEXTRACT_SERVICE: TextractOCR
     }
+    # Instances built so far, one per service type; failed builds are not stored
+    _instances: Dict[OCRServiceType, BaseOCR] = {}
 
     @classmethod
     def get_ocr_service(cls, service_type: OCRServiceType) -> BaseOCR:
         """
-        Get an instance of the specified OCR service
+        Get the shared instance of the specified OCR service, building it on first use
         
         Args:
             service_type: The type of OCR service to instantiate
@@ -30,5 +35,23 @@ class OCRFactory:
         """
         if service_type not in cls._services:
             raise ValueError(f"Unsupported OCR service type: {service_type}")
-            
-        return cls._services[service_type]() 
\ No newline at end of file
+
+        service = cls._instances.get(service_type)
+        if service is None:
+            service = cls._instances[service_type] = cls._services[service_type]()
+        return service
+
+    @classmethod
+    async def close_services(cls) -> None:
+        """Close the OCR services built so far, e.g. on application shutdown"""
+        services = list(cls._instances.values())
+        cls._instances.clear()
+        for service in services:
+            # Services without a close method hold no async resources (e.g. Textract's boto3 client)
+            close = getattr(service, "close", None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception as e:
+                logger.warning("Could not close %s: %s", type(service).__name__, e)
@@ -2,11 +2,12 @@ import os
 import logging
 from io import BytesIO
 from azure.core.credentials import AzureKeyCredential
-from azure.ai.documentintelligence import DocumentIntelligenceClient
-from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
+from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
 from fastapi import HTTPException
-from typing import List, Dict
-from ..base_ocr import BaseOCR
+from typing import List, Dict, Optional
+from config import SETTINGS
+from ..base_ocr import BaseOCR, ocr_page
+from .._cache import cached_ocr
 
 logger = logging.getLogger(__name__)
 
@@ -23,43 +24,39 @@ class AzureOCR(BaseOCR):
             credential=AzureKeyCredential(key)
         )
 
-    async def process_document(self, content: bytes, filename: str) -> List[Dict]:
+    async def close(self) -> None:
+        """Close the async client's aiohttp session"""
+        await self.client.close()
+
+    @cached_ocr("azure:prebuilt-read", maxsize=SETTINGS.OCR_RESULT_CACHE_SIZE, ttl=SETTINGS.OCR_RESULT_CACHE_TTL)
+    async def process_document(self, content: bytes, filename: str, page_count: Optional[int] = None) -> List[Dict]:
         """
-        Process a document using Azure Document Intelligence Read Model
+        Process a document using Azure Document Intelligence Read Model; the
+        service reports pages itself, so page_count is not needed
         """
         try:
             logger.info(f"Starting Azure Document Intelligence OCR for file: {filename}")
             
-            # Create the request with the document content
-            request = AnalyzeDocumentRequest(bytes_source=content)
-            
-            # Start the document analysis operation
-            poller = self.client.begin_analyze_document(
+            # Start the document analysis operation, sending the document as the raw
+            # request body rather than base64 inside a JSON AnalyzeDocumentRequest;
+            # the service detects the file type itself
+            poller = await self.client.begin_analyze_document(
                 model_id="prebuilt-read",
-                body=request
+                body=content,
+                content_type="application/octet-stream"
             )
             
-            # Wait for the operation to complete
-            result = poller.result()
+            # Wait for the operation to complete without blocking the event loop
+            result = await poller.result()
 
             #logger.info(f"Azure Document Intelligence OCR result: {result}")
 
             # Process results into structured output
-            pages = []
-            for page in result.pages:
-                lines = [line.content for line in page.lines]
-                text = "\n".join(lines)
-                
-                pages.append({
-                    "page_number": page.page_number,
-                    "text": text,
-                    "isRelevant": False,
-                    "foundTerms": [],
-                    "foundTermsCount": 0,
-                    "uniqueTermsCount": 0,
-                    "classification": "Not Relevant",
-                    "isOcr": True
-                })
+            # A page without text has no lines
+            pages = [
+                ocr_page(page.page_number, "\n".join([line.content for line in page.lines or ()]))
+                for page in result.pages
+            ]
 
             logger.info(f"Azure Document Intelligence OCR complete: {len(pages)} pages processed.")
             return pages
@@ -1,12 +1,37 @@
+import asyncio
 import os
 import time
 import logging
-from typing import Dict, Any
+import uuid
+from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Union
 import boto3
+import pymupdf
 from botocore.exceptions import ClientError
+from config import SETTINGS
+from ..base_ocr import ocr_page
+from .._cache import cached_ocr
 
 logger = logging.getLogger(__name__)
 
+# Multi-page PDFs are staged in S3 under this prefix for asynchronous text detection
+TEXTRACT_STAGING_PREFIX = "textract-input/"
+# Polling of an asynchronous text detection job: first delay, maximum delay and overall limit in seconds
+TEXTRACT_POLL_INITIAL = 0.5
+TEXTRACT_POLL_MAX = 5.0
+TEXTRACT_JOB_TIMEOUT = 300.0
+
+def _pages_from_blocks(blocks: Iterable[Dict], page_count: int) -> List[Dict]:
+    """Join the LINE blocks of each page into page dictionaries in the BaseOCR format"""
+    lines_by_page = defaultdict(list)
+    for block in blocks:
+        if block['BlockType'] == 'LINE':
+            lines_by_page[block.get('Page', 1)].append(block['Text'])
+    return [
+        ocr_page(page_number, "\n".join(lines_by_page.get(page_number, ())))
+        for page_number in range(1, page_count + 1)
+    ]
+
 class TextractOCR:
     def __init__(self):
         self.client = boto3.client(
@@ -15,23 +40,54 @@ class TextractOCR:
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
         )
+        # Staging bucket client for multi-page PDFs, built on first use
+        self._s3_client = None
+
+    @property
+    def s3_client(self):
+        """S3 client for the staging bucket"""
+        if self._s3_client is None:
+            self._s3_client = boto3.client(
+                's3',
+                region_name=os.getenv('AWS_REGION'),
+                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+            )
+        return self._s3_client
 
-    async def process_document(self, content: bytes) -> Dict[str, Any]:
+    @cached_ocr("textract:detect-document-text", maxsize=SETTINGS.OCR_RESULT_CACHE_SIZE, ttl=SETTINGS.OCR_RESULT_CACHE_TTL)
+    async def process_document(
+        self, content: bytes, filename: Optional[str] = None, page_count: Optional[int] = None
+    ) -> Union[Dict[str, Any], List[Dict]]:
         """
         Extract text from document content using AWS Textract
+
+        Images, such as a rendered result page, are sent to the synchronous API.
+        PDFs are returned page by page like the other OCR services; multi-page
+        PDFs go through asynchronous text detection, which processes their pages
+        in parallel on the AWS side.
         
         Args:
             content (bytes): The document content as bytes
+            filename: The name of the file, for logging
+            page_count: Number of pages of a PDF, when the caller already parsed it
             
         Returns:
-            Dict containing extracted text and timing information
+            Dict containing extracted text and timing information for an image,
+            or a list of page dictionaries for a PDF
         """
+        if content[:5] == b'%PDF-':
+            return await self._process_pdf(content, filename or 'document.pdf', page_count)
+
         try:
             # Start Textract processing
             textract_start = time.perf_counter()
             logger.info(f'Textract API call started at: {textract_start}')
             
-            response = self.client.detect_document_text(
+            # boto3 clients are thread-safe; run the blocking call in a worker thread
+            # so concurrent result page OCR calls overlap instead of stalling the loop
+            response = await asyncio.to_thread(
+                self.client.detect_document_text,
                 Document={
                     'Bytes': content
                 }
@@ -65,5 +121,81 @@ class TextractOCR:
             logger.error(f'Unexpected error in Textract processing: {str(e)}')
             raise e
 
-# Create a singleton instance
-textract_service = TextractOCR() 
\ No newline at end of file
+    async def _process_pdf(self, content: bytes, filename: str, page_count: Optional[int] = None) -> List[Dict]:
+        """
+        OCR a PDF into page dictionaries, staging multi-page documents in S3
+
+        Args:
+            content: The PDF content as bytes
+            filename: The name of the file, for logging
+            page_count: Number of pages; the PDF is only parsed to count them when not given
+
+        Returns:
+            List of page dictionaries in the BaseOCR format
+        """
+        if page_count is None:
+            with pymupdf.open(stream=content, filetype="pdf") as pdf_document:
+                page_count = pdf_document.page_count
+        logger.info(f'Starting Textract OCR for {filename}: {page_count} pages')
+
+        try:
+            if page_count <= 1:
+                # The synchronous API accepts single-page PDFs directly
+                response = await asyncio.to_thread(self.client.detect_document_text, Document={'Bytes': content})
+                return _pages_from_blocks(response['Blocks'], max(page_count, 1))
+
+            blocks = await self._detect_document_text_async(content)
+            pages = _pages_from_blocks(blocks, page_count)
+            logger.info(f'Textract OCR complete: {len(pages)} pages processed.')
+            return pages
+
+        except ClientError as e:
+            logger.error(f'Error in Textract processing: {str(e)}')
+            raise e
+        except Exception as e:
+            logger.error(f'Unexpected error in Textract processing: {str(e)}')
+            raise e
+
+    async def _detect_document_text_async(self, content: bytes) -> List[Dict]:
+        """Run an asynchronous text detection job on a staged copy of the PDF and return all its blocks"""
+        bucket = SETTINGS.AWS_S3_BUCKET_NAME
+        key = f"{TEXTRACT_STAGING_PREFIX}{uuid.uuid4().hex}.pdf"
+        await asyncio.to_thread(
+            self.s3_client.put_object, Bucket=bucket, Key=key, Body=content, ContentType='application/pdf'
+        )
+        try:
+            job = await asyncio.to_thread(
+                self.client.start_document_text_detection,
+                DocumentLocation={'S3Object': {'Bucket': bucket, 'Name': key}}
+            )
+            job_id = job['JobId']
+
+            # Poll with exponential backoff until the job finishes
+            delay = TEXTRACT_POLL_INITIAL
+            deadline = time.monotonic() + TEXTRACT_JOB_TIMEOUT
+            while True:
+                await asyncio.sleep(delay)
+                response = await asyncio.to_thread(self.client.get_document_text_detection, JobId=job_id)
+                status = response['JobStatus']
+                if status != 'IN_PROGRESS':
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Textract job {job_id} did not finish within {TEXTRACT_JOB_TIMEOUT} seconds")
+                delay = min(delay * 2, TEXTRACT_POLL_MAX)
+
+            if status not in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+                raise RuntimeError(f"Textract job {job_id} ended with status {status}: {response.get('StatusMessage', '')}")
+
+            # Results are paginated; follow NextToken for the remaining blocks
+            blocks = list(response['Blocks'])
+            while 'NextToken' in response:
+                response = await asyncio.to_thread(
+                    self.client.get_document_text_detection, JobId=job_id, NextToken=response['NextToken']
+                )
+                blocks.extend(response['Blocks'])
+            return blocks
+        finally:
+            try:
+                await asyncio.to_thread(self.s3_client.delete_object, Bucket=bucket, Key=key)
+            except ClientError as e:
+                logger.warning(f'Could not delete staged Textract input {key}: {str(e)}')
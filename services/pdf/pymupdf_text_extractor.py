@@ -1,34 +1,81 @@
+import asyncio
+import threading
 import pymupdf
 import logging
+from typing import Dict, Iterator, Optional
 from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 
+# Plain text extraction flags without ligature preservation, so ligature glyphs
+# come out as their letters ("fi", "ffl") and financial terms still match
+TEXT_FLAGS = pymupdf.TEXTFLAGS_TEXT & ~pymupdf.TEXT_PRESERVE_LIGATURES
+
 class PyMuPDFTextExtractor:
     def __init__(self):
         pass
 
-    async def extract_text(self, pdf_document: pymupdf.Document):
-        """Extract text from PDF document object using PyMuPDF"""
+    async def produce_pages(self, pdf_document: pymupdf.Document, queue: asyncio.Queue, stop: threading.Event) -> None:
+        """
+        Extract pages in a worker thread and put them on the queue as they are ready.
+        A None sentinel is always queued last, including when extraction fails.
+        When cancelled, the page being extracted is finished before the cancellation
+        propagates, so the document is never read after the caller closes it.
+
+        Args:
+            pdf_document: The open PyMuPDF document
+            queue: Bounded queue read by the page analysis consumer
+            stop: Set by the consumer to end extraction after the current page
+
+        Raises:
+            HTTPException: If the PDF is invalid or no text could be extracted
+        """
+        page_count = 0
         try:
-            pages = []
-            for page_num in range(len(pdf_document)):
+            pages = self.iter_pages(pdf_document, stop)
+            while True:
+                extraction = asyncio.ensure_future(asyncio.to_thread(next, pages, None))
                 try:
-                    page = pdf_document[page_num]
-                    text = page.get_text()
-                    pages.append({
-                        "page_number": page_num + 1,
-                        "text": text
-                    })
-                except Exception as e:
-                    logger.error(f"Error extracting text from page {page_num + 1}: {str(e)}")
-                    continue
-            
-            if not pages:
-                raise HTTPException(status_code=400, detail="Could not extract text from PDF")
-            
-            return pages
-
+                    page = await asyncio.shield(extraction)
+                except asyncio.CancelledError:
+                    # Cancelling does not stop the worker thread; wait until it lets go of the document
+                    await asyncio.wait({extraction})
+                    raise
+                if page is None:
+                    break
+                await queue.put(page)
+                page_count += 1
         except Exception as e:
             logger.error(f"Error processing PDF: {str(e)}")
-            raise HTTPException(status_code=400, detail="Invalid PDF file")
\ No newline at end of file
+            await queue.put(None)
+            raise HTTPException(status_code=400, detail="Invalid PDF file")
+
+        await queue.put(None)
+        if not page_count:
+            raise HTTPException(status_code=400, detail="Could not extract text from PDF")
+
+    @staticmethod
+    def iter_pages(pdf_document: pymupdf.Document, stop: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        Lazily yield the text of each page, skipping pages that fail
+
+        Args:
+            pdf_document: The open PyMuPDF document
+            stop: Optional signal checked before each page; once set, no further page is read
+
+        Returns:
+            Iterator of page dictionaries with page_number and text
+        """
+        for page_num in range(len(pdf_document)):
+            if stop is not None and stop.is_set():
+                return
+            try:
+                page = pdf_document[page_num]
+                text = page.get_text("text", flags=TEXT_FLAGS)
+            except Exception as e:
+                logger.error(f"Error extracting text from page {page_num + 1}: {str(e)}")
+                continue
+            yield {
+                "page_number": page_num + 1,
+                "text": text
+            }
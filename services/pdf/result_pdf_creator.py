@@ -1,9 +1,20 @@
 import logging
 import pymupdf
 import io
+from typing import List, Tuple
 
 logger = logging.getLogger(__name__)
 
+def _page_runs(page_nums: List[int]) -> List[Tuple[int, int]]:
+    """Group page numbers into (first, last) runs of consecutive pages, keeping their order"""
+    runs = []
+    for page_num in page_nums:
+        if runs and page_num == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page_num)
+        else:
+            runs.append((page_num, page_num))
+    return runs
+
 class ResultPDFCreator:
     def __init__(self):
         pass
@@ -32,18 +43,33 @@ class ResultPDFCreator:
                     logger.warning("No valid pages to copy")
                     return None
 
-                for page_num in valid_pages:
+                # One insert per run of consecutive pages; the source's shared
+                # resources are only copied once as long as final stays off
+                runs = _page_runs(valid_pages)
+                for index, (first_page, last_page) in enumerate(runs):
+                    final = index == len(runs) - 1
                     try:
-                        result_doc.insert_pdf(source_pdf, from_page=page_num, to_page=page_num)
-                        logger.info(f"Successfully copied page {page_num + 1}")
+                        result_doc.insert_pdf(source_pdf, from_page=first_page, to_page=last_page, final=final)
+                        logger.info(f"Successfully copied pages {first_page + 1}-{last_page + 1}")
                     except Exception as e:
-                        logger.error(f"Error copying page {page_num + 1}: {str(e)}")
-                        continue
+                        logger.error(f"Error copying pages {first_page + 1}-{last_page + 1}: {str(e)}")
+                        # Retry page by page so one bad page does not drop the whole run
+                        for page_num in range(first_page, last_page + 1):
+                            try:
+                                result_doc.insert_pdf(source_pdf, from_page=page_num, to_page=page_num, final=final)
+                                logger.info(f"Successfully copied page {page_num + 1}")
+                            except Exception as e:
+                                logger.error(f"Error copying page {page_num + 1}: {str(e)}")
+                                continue
 
                 if result_doc.page_count > 0:
                     # Save to memory instead of disk
-                    pdf_bytes = result_doc.tobytes()
-                    logger.info(f"Result PDF created with {result_doc.page_count} pages")
+                    # Drop objects left unused by insert_pdf, merge duplicates and compress
+                    # every stream, so fewer bytes go to S3 and Telegram
+                    pdf_bytes = result_doc.tobytes(
+                        garbage=4, deflate=True, deflate_images=True, deflate_fonts=True
+                    )
+                    logger.info(f"Result PDF created with {result_doc.page_count} pages ({len(pdf_bytes)} bytes)")
                     return pdf_bytes
                 
                 logger.warning("No pages were successfully copied to result PDF")
@@ -2,21 +2,24 @@ import boto3
 import logging
 from botocore.exceptions import ClientError
 from typing import Optional
-import config
+from config import SETTINGS
 import datetime
-import re
 
 logger = logging.getLogger(__name__)
 
+# Characters replaced by an underscore in result keys: whitespace, and characters
+# that would break the public URL or the Content-Disposition header
+_FILENAME_TRANSLATION = str.maketrans({c: '_' for c in ' \t\n\r?#&%+/\\"'})
+
 class S3Service:
     def __init__(self):
         self.s3_client = boto3.client(
             's3',
-            aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-            region_name=config.AWS_REGION
+            aws_access_key_id=SETTINGS.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=SETTINGS.AWS_SECRET_ACCESS_KEY,
+            region_name=SETTINGS.AWS_REGION
         )
-        self.bucket_name = config.AWS_S3_BUCKET_NAME
+        self.bucket_name = SETTINGS.AWS_S3_BUCKET_NAME
     
     def _generate_result_filename(self, original_filename: str) -> str:
         """
@@ -26,13 +29,13 @@ class S3Service:
             original_filename: The original filename
             
         Returns:
-            Formatted result filename with internal spaces replaced by a single underscore
-            and leading/trailing spaces removed
+            Formatted result filename with internal spaces and URL-unsafe characters
+            replaced by an underscore and leading/trailing spaces removed
         """
   
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        # Trim leading and trailing spaces, then replace spaces with underscore
-        normalized_filename = original_filename.strip().replace(' ', '_')
+        # Trim leading and trailing spaces, then replace spaces and unsafe characters with underscore
+        normalized_filename = original_filename.strip().translate(_FILENAME_TRANSLATION)
         # Remove file extension for cleaner, shorter URLs
         if '.' in normalized_filename:
             normalized_filename = normalized_filename.rsplit('.', 1)[0]
@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+import pymupdf
+
+from core.document_processor import DocumentProcessor
+from services.pdf.pymupdf_text_extractor import PyMuPDFTextExtractor
+
+
+class SlowTextExtractor(PyMuPDFTextExtractor):
+    """Extractor that records whether the document was open for every page it read"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+        self._lock = threading.Lock()
+
+    def iter_pages(self, pdf_document, stop=None):
+        for page in super().iter_pages(pdf_document, stop):
+            # Keep the worker thread busy so the consumer fails mid-extraction
+            time.sleep(0.05)
+            with self._lock:
+                self.reads.append(pdf_document.is_closed)
+            yield page
+
+
+class FailingTextAnalyzer:
+    """Analyzer that raises on the given page number"""
+
+    def __init__(self, fail_on: int):
+        self.fail_on = fail_on
+
+    def analyze_page(self, text, page_number):
+        if page_number == self.fail_on:
+            raise RuntimeError(f"analysis failed on page {page_number}")
+        return page_number
+
+
+class ExtractAndAnalyzeTest(unittest.IsolatedAsyncioTestCase):
+    async def test_consumer_error_stops_extraction_before_document_closes(self):
+        page_count = 20
+        extractor = SlowTextExtractor()
+        processor = SimpleNamespace(text_extractor=extractor, text_analyzer=FailingTextAnalyzer(fail_on=2))
+
+        pdf_document = pymupdf.open()
+        for page_num in range(page_count):
+            pdf_document.new_page().insert_text((72, 72), f"Page {page_num + 1}")
+
+        with self.assertRaisesRegex(RuntimeError, "page 2"):
+            with pdf_document:
+                await DocumentProcessor._extract_and_analyze(processor, pdf_document, None)
+
+        # Give a leaked worker thread time to touch the closed document
+        time.sleep(0.2)
+        self.assertTrue(pdf_document.is_closed)
+        self.assertNotIn(True, extractor.reads)
+        self.assertLess(len(extractor.reads), page_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
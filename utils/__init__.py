@@ -0,0 +1,7 @@
+"""
+Utilities package containing small helpers shared across the application.
+"""
+from .lazy import LazyLoader
+from .timing import get_timings, reset_timings, stage, timed
+
+__all__ = ['LazyLoader', 'get_timings', 'reset_timings', 'stage', 'timed']
@@ -0,0 +1,29 @@
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+class LazyLoader(Generic[T]):
+    """Defers construction of an object until it is first accessed"""
+
+    def __init__(self, factory: Callable[[], T]):
+        """
+        Args:
+            factory: Zero-argument callable that builds the wrapped object
+        """
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._loaded = False
+
+    def get(self) -> T:
+        """Build the wrapped object on first call and return the memoized instance"""
+        if not self._loaded:
+            self._instance = self._factory()
+            self._loaded = True
+        return self._instance
+
+    def is_loaded(self) -> bool:
+        """Return True if the wrapped object has already been constructed"""
+        return self._loaded
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
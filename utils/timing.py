@@ -0,0 +1,56 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# Stage durations (seconds) for the request being processed in the current context
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("timings", default=None)
+
+def reset_timings() -> Dict[str, float]:
+    """
+    Start a fresh timings table for the current request.
+    Tasks and threads started afterwards share the same table.
+
+    Returns:
+        The new, empty timings dictionary
+    """
+    timings: Dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+def get_timings() -> Dict[str, float]:
+    """Return the timings table for the current context, creating it if needed"""
+    timings = _timings.get()
+    if timings is None:
+        timings = reset_timings()
+    return timings
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Record how long the wrapped block takes under the given name
+
+    Args:
+        name: Key to store the duration under in the timings table
+    """
+    timings = get_timings()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - start
+
+@contextmanager
+def timed() -> Iterator[Dict[str, float]]:
+    """
+    Time the wrapped block on its own, outside the request's timings table
+
+    Yields:
+        A dictionary that receives the block's "duration" in seconds when it exits
+    """
+    timing: Dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing["duration"] = time.perf_counter() - start